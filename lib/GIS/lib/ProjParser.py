@@ -1,3 +1,5 @@
+import functools
+
 import pyproj
 
 # 識別一段內容是否為地理/投影座標系統資訊，並以pyproj.crs.CRS物件回傳
@@ -12,22 +14,31 @@ def parse_crs(coordinate_system):
     Returns:
         A pyproj CRS object (pyproj.crs.CRS) that contains the coordinate system information.
     """
-    # if coordinate_system is EPSG code
-    if isinstance(coordinate_system, int):
-        coordinate_system = pyproj.crs.CRS.from_epsg(coordinate_system)
-    elif isinstance(coordinate_system, str) and coordinate_system.isnumeric():
-        coordinate_system = pyproj.crs.CRS.from_epsg(int(coordinate_system))
-    # if coordinate_system is WKT string
-    elif isinstance(coordinate_system, str) and coordinate_system.isnumeric() is False:
-        coordinate_system = pyproj.crs.CRS.from_wkt(coordinate_system)
+    # if coordinate_system is EPSG code or WKT string, parse it once and reuse the cached CRS object
+    if isinstance(coordinate_system, (int, str)):
+        return _parse_hashable_crs(coordinate_system)
     # if coordinate_system is pyproj CRS object
-    elif isinstance(coordinate_system, pyproj.crs.CRS):
-        coordinate_system = coordinate_system
-    # if coordinate_system is not EPSG code, WKT string, or pyproj CRS object raise an error
-    elif coordinate_system is None:
+    if isinstance(coordinate_system, pyproj.crs.CRS):
+        return coordinate_system
+    # if coordinate_system is None
+    if coordinate_system is None:
         return None
     # else raise an error
-    else:
-        raise ValueError("Invalid coordinate system. It must be an EPSG code, a WKT string, or a pyproj CRS object.")
+    raise ValueError("Invalid coordinate system. It must be an EPSG code, a WKT string, or a pyproj CRS object.")
+
+
+# 以lru_cache快取EPSG代碼與WKT字串的解析結果，避免重複查詢PROJ資料庫與解析WKT
+@functools.lru_cache(maxsize=128)
+def _parse_hashable_crs(coordinate_system):
+    # if coordinate_system is EPSG code
+    if isinstance(coordinate_system, int):
+        return pyproj.crs.CRS.from_epsg(coordinate_system)
+    # EPSG code strings start with a digit while WKT strings start with a keyword (PROJCS, GEOGCS, ...), so checking the first character is enough
+    if coordinate_system[:1].isdigit():
+        return pyproj.crs.CRS.from_epsg(int(coordinate_system))
+    # if coordinate_system is WKT string
+    return pyproj.crs.CRS.from_wkt(coordinate_system)
+
 
-    return coordinate_system
\ No newline at end of file
+# 清除快取的座標系統解析結果
+parse_crs.cache_clear = _parse_hashable_crs.cache_clear
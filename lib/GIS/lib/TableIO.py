@@ -0,0 +1,259 @@
+import csv
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+# pyarrow的csv讀取器為多執行緒，並直接將數值欄位解析成連續的緩衝區，寫入器則直接序列化欄位緩衝區；未安裝pyarrow時退回pandas
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pc = None
+    pacsv = None
+
+# 以一個不可能符合的格式取代pyarrow預設的ISO8601時間解析，使日期時間欄位與pandas相同維持原始字串
+_NO_TIMESTAMP_PARSERS = ["%Y\x00"]
+
+# 與pandas.read_csv預設相同的缺值字串與布林值字串（pyarrow預設不含"None"、"<NA>"，且會將"1"、"0"視為布林值）
+_NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+_TRUE_VALUES = ["True", "TRUE", "true"]
+_FALSE_VALUES = ["False", "FALSE", "false"]
+
+# pyarrow會將"0x10"解析成整數16、將"+5"解析成浮點數5.0，pandas則分別保留原始字串、解析成整數；標題列之後出現這些字元時才逐欄檢查
+# 只搜尋單一位元組，比搜尋"0x"快得多（數值資料中"0"極為常見）
+_RETYPE_TOKENS = (b"x", b"X", b"+")
+
+# 超出int64範圍的整數會被pyarrow解析成浮點數而失去精度（pandas則保留原始字串），浮點欄位中出現此量級的數值時改以pandas讀取
+_INT64_LIMIT = 2.0 ** 63
+
+
+class CsvStreamError(ValueError):
+    """
+    pyarrow的串流讀取器只依第一個區塊推斷欄位型態，之後的區塊無法轉換成該型態時拋出此錯誤，此時應改以use_pyarrow=False重新讀取
+    """
+
+
+# 讀取csv表格，並以pandas.DataFrame回傳
+def read_csv(path, usecols=None):
+    """
+
+    讀取csv表格，並以pandas.DataFrame回傳。若有安裝pyarrow則以其多執行緒的csv讀取器讀取，否則使用pandas.read_csv
+    有安裝pyarrow時，回傳的表格與pandas.read_csv(float_precision="round_trip")相同（浮點數正確捨入，pandas預設的解析器可能在最後一位不同）；pyarrow的解析結果與pandas不同時，改以pandas讀取
+
+    Args:
+        path(str): The path to the csv table.
+        usecols(list): (optional) Only parse these columns, skipping the others entirely. Columns that do not exist in the table are ignored. If not specified, all columns are read.
+
+    Returns:
+        A pandas DataFrame object that contains the table.
+    """
+    usecols = _existing_columns(path, usecols)
+
+    # if pyarrow is not installed, or the header repeats a column name (pyarrow rejects it, pandas renames it to "v.1"), read the table with pandas
+    if pacsv is None or _has_duplicate_header(path):
+        return _pandas_read_csv(path, usecols)
+
+    # read the table with pyarrow, treating the same strings as null and keeping date/time text as pandas does
+    # rows with a different number of fields are rejected by pyarrow, read the table with pandas instead
+    try:
+        table = pacsv.read_csv(path, convert_options=_convert_options(usecols))
+        if _temporal_columns(table.schema):
+            table = pacsv.read_csv(path, convert_options=_convert_options(usecols, _temporal_columns(table.schema)))
+    except pa.ArrowInvalid:
+        return _pandas_read_csv(path, usecols)
+
+    # integers beyond int64 were parsed as doubles, or a column was parsed into a different type than pandas would, read the table again with pandas
+    if _overflows_int64(table.columns) or _retyped(path, table.schema):
+        return _pandas_read_csv(path, usecols)
+
+    return _to_pandas(table)
+
+
+# 分塊讀取csv表格，逐塊以pandas.DataFrame產出
+def read_csv_chunks(path, chunksize, usecols=None, use_pyarrow=True, string_columns=()):
+    """
+
+    分塊讀取csv表格，逐塊以pandas.DataFrame產出。若有安裝pyarrow則以其串流讀取器讀取，否則使用pandas.read_csv(chunksize=...)
+
+    Args:
+        path(str): The path to the csv table.
+        chunksize(int): The number of rows per chunk. With pyarrow the chunks are assembled from whole parsed blocks, so a chunk may hold slightly more rows.
+        usecols(list): (optional) Only parse these columns, skipping the others entirely. Columns that do not exist in the table are ignored. If not specified, all columns are read.
+        use_pyarrow(bool): (optional) Use pyarrow's streaming reader when it is installed. Defaults to True.
+        string_columns(list): (optional) Read these columns as text (missing values stay NaN) instead of inferring their type per chunk.
+
+    Yields:
+        A pandas DataFrame object for each chunk of the table.
+
+    Raises:
+        CsvStreamError: pyarrow infers the column types from the first block only; raised when a later block does not fit them, when a block holds integers beyond the int64 range, or when pyarrow would parse a column into a different type than pandas.
+    """
+    usecols = _existing_columns(path, usecols)
+
+    # if pyarrow is not installed or not wanted, or the header repeats a column name, read the table with pandas
+    if pacsv is None or not use_pyarrow or _has_duplicate_header(path):
+        yield from _pandas_read_csv(path, usecols, chunksize=chunksize, string_columns=string_columns)
+        return
+
+    # gather the streamed record batches until a chunk has at least chunksize rows
+    batches = []
+    rows = 0
+    try:
+        reader = pacsv.open_csv(path, convert_options=_convert_options(usecols, string_columns))
+        if _temporal_columns(reader.schema):
+            reader = pacsv.open_csv(path, convert_options=_convert_options(usecols, [*string_columns, *_temporal_columns(reader.schema)]))
+        if _retyped(path, reader.schema):
+            raise CsvStreamError("columns parsed into a different type than pandas would")
+        for batch in reader:
+            if _overflows_int64(batch.columns):
+                raise CsvStreamError("integer values out of the int64 range")
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= chunksize:
+                yield _to_pandas(pa.Table.from_batches(batches))
+                batches = []
+                rows = 0
+    except pa.ArrowInvalid as error:
+        raise CsvStreamError(str(error)) from error
+    if batches:
+        yield _to_pandas(pa.Table.from_batches(batches))
+
+
+def _pandas_read_csv(path, usecols, chunksize=None, string_columns=()):
+    # 有安裝pyarrow時以round_trip解析浮點數，使退回pandas讀取的表格與pyarrow讀取的結果相同
+    float_precision = "round_trip" if pacsv is not None else None
+    dtype = {name: str for name in string_columns} or None
+    return pd.read_csv(path, usecols=usecols, chunksize=chunksize, float_precision=float_precision, dtype=dtype)
+
+
+def _existing_columns(path, usecols):
+    # keep only the requested columns that exist, in the order they appear in the table
+    if usecols is None:
+        return None
+    header = pd.read_csv(path, nrows=0).columns
+    return [name for name in header if name in usecols]
+
+
+def _has_duplicate_header(path):
+    # compare the raw header names, before pandas renames the repeated ones
+    with open(path, newline="", encoding="utf-8") as file:
+        header = next(csv.reader(file), [])
+    return len(set(header)) != len(header)
+
+
+def _temporal_columns(schema):
+    # 時間戳記的解析已停用，但pyarrow仍會將"2020-01-01"、"12:30"推斷為日期、時間型態，這些欄位須以字串重新讀取
+    return [field.name for field in schema if pa.types.is_temporal(field.type)]
+
+
+def _to_pandas(table):
+    # pyarrow的全空欄位與含缺值的布林欄位轉換後以None表示缺值，pandas.read_csv則分別讀成float64欄位、以NaN表示缺值的object欄位
+    df = table.to_pandas()
+    for field in table.schema:
+        if pa.types.is_null(field.type):
+            df[field.name] = np.nan
+        elif pa.types.is_boolean(field.type) and table.column(field.name).null_count:
+            df[field.name] = df[field.name].astype(object).where(df[field.name].notna(), np.nan)
+    return df
+
+
+def _retyped(path, schema):
+    # 以字串重新串流讀取數值欄位，檢查是否有pyarrow解析成整數的十六進位文字，或因"+"號而解析成浮點數、pandas則會解析成整數的欄位
+    integer = [field.name for field in schema if pa.types.is_integer(field.type)]
+    floating = [field.name for field in schema if pa.types.is_floating(field.type)]
+    if not (integer or floating) or not _contains_any(path, _RETYPE_TOKENS):
+        return False
+
+    options = pacsv.ConvertOptions(
+        include_columns=integer + floating,
+        column_types={name: pa.string() for name in integer + floating},
+        null_values=_NA_VALUES,
+        strings_can_be_null=True
+        )
+    integral = dict.fromkeys(floating, True)
+    for batch in pacsv.open_csv(path, convert_options=options):
+        for name in integer:
+            if pc.any(pc.match_substring_regex(batch[name], r"0[xX]")).as_py():
+                return True
+        for name in floating:
+            column = batch[name]
+            integral[name] = integral[name] and column.null_count == 0 and pc.all(pc.match_substring_regex(column, r"^\s*[+-]?\d+\s*$")).as_py() is not False
+    return any(integral.values())
+
+
+def _contains_any(path, tokens):
+    # 以mmap在標題列之後搜尋位元組字串，不需將檔案讀入記憶體
+    if os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = data.find(b"\n")
+        return start != -1 and any(data.find(token, start) != -1 for token in tokens)
+
+
+def _overflows_int64(columns):
+    # a float column holding a value at least as large as the int64 limit may come from integers that pandas keeps as text
+    return any(
+        pa.types.is_floating(column.type) and (pc.max(pc.abs(column)).as_py() or 0) >= _INT64_LIMIT
+        for column in columns
+        )
+
+
+def _convert_options(usecols, string_columns=()):
+    # treat the same strings as null or boolean and keep date/time text as pandas does
+    return pacsv.ConvertOptions(
+        include_columns=usecols,
+        column_types={name: pa.string() for name in string_columns},
+        null_values=_NA_VALUES,
+        true_values=_TRUE_VALUES,
+        false_values=_FALSE_VALUES,
+        strings_can_be_null=True,
+        timestamp_parsers=_NO_TIMESTAMP_PARSERS
+        )
+
+
+# 將pandas.DataFrame寫出成csv表格
+def write_csv(df, path, append=False, index=False):
+    """
+
+    將pandas.DataFrame寫出成csv表格（預設不含索引）。若有安裝pyarrow且所有欄位皆為數值，則以pyarrow的csv寫入器寫出，否則使用DataFrame.to_csv；兩者寫出的文字相同
+
+    Args:
+        df(pandas.DataFrame): The table to be written.
+        path(str): The path to the output csv table.
+        append(bool): (optional) Append the rows to the end of an existing csv table without writing the header again. Defaults to False (overwrite the table).
+        index(bool): (optional) Write the row index as the first, unnamed column. Defaults to False.
+    """
+    # pyarrow would quote the header and write strings/booleans differently from pandas, so only numeric tables with plain column names go through it
+    # a single-column row holding only NaN is written by pandas as '""', so single-column tables also stay with pandas
+    # lines always end with "\n" (as pyarrow writes them) instead of the platform's line separator
+    if pacsv is None or index or len(df.columns) < 2 or not _is_plain_numeric_table(df):
+        df.to_csv(path, index=index, mode="a" if append else "w", header=not append, lineterminator="\n")
+        return
+
+    # write the header line the same way as pandas, then the numeric values with pyarrow
+    # float columns are formatted beforehand so the text is the same whichever writer handles a table or a streamed chunk
+    table = pa.table({name: _csv_column(values) for name, values in df.items()})
+    with open(path, "ab" if append else "wb") as file:
+        if not append:
+            file.write((",".join(df.columns) + "\n").encode("utf-8"))
+        pacsv.write_csv(table, file, write_options=pacsv.WriteOptions(include_header=False, quoting_style="none"))
+
+
+def _is_plain_numeric_table(df):
+    # every column is an integer or float column, no column name needs to be quoted, and the names are unique
+    return df.columns.is_unique and all(
+        isinstance(name, str) and not any(char in name for char in ',"\r\n') and dtype.kind in "iuf"
+        for name, dtype in df.dtypes.items()
+        )
+
+
+def _csv_column(series):
+    # format floats as DataFrame.to_csv does (shortest round-trip repr such as "100.0" or "8.983152841195214e-06", empty for NaN), integers are written by pyarrow as is
+    values = series.to_numpy()
+    if values.dtype.kind != "f":
+        return pa.array(values)
+    return pa.array(values.astype(str), mask=np.isnan(values))
@@ -1,11 +1,25 @@
 # Author: ericlwc
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import pyproj
+import shapely
+
+# shapely 2.0以上提供向量化的函式（如shapely.points），可直接以numpy陣列一次處理所有圖徵；舊版則退回geopandas的對應函式
+_SHAPELY2 = hasattr(shapely, "points")
+
+# 讀寫shapefile時優先使用向量化的pyogrio引擎，未安裝時才退回逐筆處理的fiona
+try:
+    import pyogrio
+    _ENGINE = "pyogrio"
+except ImportError:
+    _ENGINE = "fiona"
 
 from GIS.lib.ProjParser import parse_crs
+from GIS.lib.TableIO import read_csv
 
-def XYTableToPoint(in_table, out_feature_class, x_field, y_field, z_field=None, coordinate_system=None):
+def XYTableToPoint(in_table, out_feature_class, x_field, y_field, z_field=None, coordinate_system=None, chunksize=None):
     """
     Creates a point feature class from an input table with x, y and z coordinates.
     從包含x、y、z座標的輸入表格創建一個點圖徵類別。
@@ -17,9 +31,10 @@ def XYTableToPoint(in_table, out_feature_class, x_field, y_field, z_field=None,
         y_field(str): The field in the input table that contains the Y coordinates (or latitude).
         z_field(str): (optional) The field in the input table that contains the Z coordinates. If not specified, the output point features will have no Z values.
         coordinate_system: (optional) The coordinate system of the x and y coordinates. It can be an EPSG code if int, a WKT string if str, or a pyproj CRS object. If not specified, the output feature class will have no coordinate system defined.
+        chunksize(int): (optional) Read and convert the input table this many rows at a time, appending each chunk to out_feature_class so that only one chunk is held in memory. Requires out_feature_class to be a path. If not specified, the whole table is read at once.
     
     Returns:
-        A geopandas GeoDataFrame object that contains the point features.
+        A geopandas GeoDataFrame object that contains the point features, or None if chunksize is specified (the point features are only streamed to out_feature_class).
 
     Output:
         A shapefile that contains the point features at specific (out_feature_class) path.
@@ -35,10 +50,36 @@ def XYTableToPoint(in_table, out_feature_class, x_field, y_field, z_field=None,
     """    
     # 編輯記錄
     # 2023/06/24 撰寫
+    # 2026/10/15 以shapely.points直接由numpy陣列建立點圖徵
+    # 2026/10/15 shapefile讀寫改用pyogrio引擎
+    # 2026/10/15 新增chunksize參數，可逐塊讀取表格並附加寫入shapefile
+    # 2026/10/15 有安裝pyarrow時以其csv讀取器讀取表格
+
+    # STREAM the input table chunk by chunk, appending each chunk's point features to the output shapefile
+    if chunksize is not None:
+        if not isinstance(out_feature_class, str):
+            raise ValueError("Invalid output feature class. It must be a path to a shapefile when chunksize is specified.")
+        if isinstance(in_table, str):
+            chunks = pd.read_csv(in_table, chunksize=chunksize)
+        elif isinstance(in_table, pd.DataFrame):
+            chunks = (in_table.iloc[start:start + chunksize] for start in range(0, len(in_table), chunksize))
+        else:
+            raise ValueError("Invalid input table. It must be a path to a csv or txt file, or a pandas DataFrame object.")
+        for i, chunk in enumerate(chunks):
+            gdf = XYTableToPoint(
+                in_table=chunk,
+                out_feature_class=None,
+                x_field=x_field,
+                y_field=y_field,
+                z_field=z_field,
+                coordinate_system=coordinate_system
+                )
+            gdf.to_file(out_feature_class, driver="ESRI Shapefile", encoding='utf-8', engine=_ENGINE, mode="w" if i == 0 else "a")
+        return None
 
     # READ the input table as a pandas DataFrame
     if isinstance(in_table, str):
-        df = pd.read_csv(in_table)
+        df = read_csv(in_table)
     elif isinstance(in_table, pd.DataFrame):
         df = in_table
     else:
@@ -53,18 +94,24 @@ def XYTableToPoint(in_table, out_feature_class, x_field, y_field, z_field=None,
         raise ValueError(f"The z field '{z_field}' does not exist in the input table.")
 
     # Create a geopandas GeoDataFrame from the pandas DataFrame
-    # Use geopandas.points_from_xy to create a geometry column from the x and y fields
+    # Use shapely.points on the raw numpy arrays (or geopandas.points_from_xy on shapely < 2.0) to create a geometry column from the x and y fields
     # Optionally, pass the z field to create 3D point geometries
-    if z_field is not None:
-        gdf = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df[x_field], df[y_field], df[z_field]))
+    # The fields are cast to float64 as points_from_xy does, so object columns (e.g. from a header-only table) also work
+    if _SHAPELY2:
+        if z_field is not None:
+            geometry = shapely.points(df[x_field].to_numpy(dtype=np.float64), df[y_field].to_numpy(dtype=np.float64), df[z_field].to_numpy(dtype=np.float64))
+        else:
+            geometry = shapely.points(df[x_field].to_numpy(dtype=np.float64), df[y_field].to_numpy(dtype=np.float64))
     else:
-        gdf = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df[x_field], df[y_field]))
+        if z_field is not None:
+            geometry = gpd.points_from_xy(df[x_field], df[y_field], df[z_field])
+        else:
+            geometry = gpd.points_from_xy(df[x_field], df[y_field])
+    gdf = gpd.GeoDataFrame(df, geometry=geometry)
 
     # Set CRS. Use geopandas.GeoDataFrame.set_crs to assign or change the CRS
     # If coordinate_system is not specified, the output feature class will have no coordinate system defined
-    if coordinate_system is None:
-        pass
-    else:
+    if coordinate_system is not None:
         crs = parse_crs(coordinate_system)
         gdf = gdf.set_crs(crs = crs)
 
@@ -73,10 +120,8 @@ def XYTableToPoint(in_table, out_feature_class, x_field, y_field, z_field=None,
     # Write the output feature class as a shapefile or a geopackage file
     # Use geopandas.GeoDataFrame.to_file to save the GeoDataFrame to disk
     if isinstance(out_feature_class, str):
-        gdf.to_file(out_feature_class, driver="ESRI Shapefile", encoding='utf-8')
-    elif out_feature_class is None:
-        pass
-    else:
+        gdf.to_file(out_feature_class, driver="ESRI Shapefile", encoding='utf-8', engine=_ENGINE)
+    elif out_feature_class is not None:
         raise ValueError("Invalid output feature class. It must be a path to a shapefile.")
 
     # Return the output feature class as a GeoDataFrame
@@ -108,10 +153,12 @@ def Project(in_dataset, out_dataset, out_coor_system):
     """
     # 編輯記錄
     # 2023/06/25 撰寫
+    # 2026/10/15 shapefile讀寫改用pyogrio引擎
+    # 2026/10/15 點圖徵改以pyproj.Transformer直接投影座標陣列
 
     # Read the input dataset as a geopandas GeoDataFrame
     if isinstance(in_dataset, str):
-        gdf = gpd.read_file(in_dataset)
+        gdf = gpd.read_file(in_dataset, engine=_ENGINE)
     elif isinstance(in_dataset, gpd.GeoDataFrame):
         gdf = in_dataset
     else:
@@ -123,16 +170,52 @@ def Project(in_dataset, out_dataset, out_coor_system):
         print("Warning: The output coordinate system is not specified. The output dataset will same as the input dataset.")
     else:
         out_coor_system = parse_crs(out_coor_system)
-        gdf = gdf.to_crs(crs = out_coor_system)
+        # For point layers, transform the coordinate arrays directly instead of rebuilding every geometry through to_crs
+        projected = _project_points(gdf, out_coor_system)
+        if projected is not None:
+            gdf = projected
+        else:
+            gdf = gdf.to_crs(crs = out_coor_system)
 
     # Write the output dataset as a shapefile or a geopackage file
     # Use geopandas.GeoDataFrame.to_file to save the GeoDataFrame to disk
     if isinstance(out_dataset, str):
-        gdf.to_file(out_dataset)
-    elif out_dataset is None:
-        pass
-    else:
+        gdf.to_file(out_dataset, engine=_ENGINE)
+    elif out_dataset is not None:
         raise ValueError("Invalid output dataset. It must be a path to a shapefile.")
 
     # Return the output dataset as a GeoDataFrame
-    return gdf
\ No newline at end of file
+    return gdf
+
+
+
+def _project_points(gdf, crs):
+    """
+    以pyproj.Transformer直接投影點圖徵的座標陣列並重建點圖徵，結果與GeoDataFrame.to_crs相同。
+
+    Args:
+        gdf(GeoDataFrame): The point features to be projected. It must have a coordinate system defined.
+        crs(pyproj.crs.CRS): The coordinate system to which the point features will be projected.
+
+    Returns:
+        A projected copy of gdf, or None if gdf is not a layer of non-empty points (all 2D or all 3D), in which case GeoDataFrame.to_crs should be used.
+    """
+    if not _SHAPELY2 or gdf.crs is None or len(gdf) == 0:
+        return None
+
+    # CHECK every geometry is a non-empty point (missing geometries have type id -1), and the points are all 2D or all 3D
+    geometry = gdf.geometry.to_numpy()
+    if not (shapely.get_type_id(geometry) == 0).all() or shapely.is_empty(geometry).any():
+        return None
+    has_z = shapely.has_z(geometry)
+    if has_z.any() and not has_z.all():
+        return None
+
+    # Transform the (n, 2) or (n, 3) coordinate array in one batched call and rebuild the points from the result
+    coordinates = shapely.get_coordinates(geometry, include_z=bool(has_z[0]))
+    transformer = pyproj.Transformer.from_crs(gdf.crs, crs, always_xy=True)
+    projected = transformer.transform(*coordinates.T)
+
+    gdf = gdf.copy()
+    gdf[gdf.geometry.name] = gpd.GeoSeries(shapely.points(*projected), index=gdf.index, crs=crs)
+    return gdf
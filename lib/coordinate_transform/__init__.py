@@ -1 +1 @@
-from coordinate_transform.coordinate_transform import coordinate_transform
\ No newline at end of file
+from coordinate_transform.coordinate_transform import coordinate_transform, coordinate_transform_geo
\ No newline at end of file
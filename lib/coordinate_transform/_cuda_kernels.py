@@ -0,0 +1,51 @@
+# Author: ericlwc
+
+# 網路麥卡托投影的CUDA核心，只在座標筆數超過kernels._CUDA_THRESHOLD且有可用的GPU時才import此模組
+
+import math
+
+from numba import cuda
+
+from coordinate_transform.kernels import _EPS12, _LON_MAX
+
+
+@cuda.jit(device=True)
+def _adjlon_device(lon):
+    # 將經度（弧度）正規化至[-π, π]
+    if abs(lon) > math.pi:
+        lon = lon - 2.0 * math.pi * math.floor((lon + math.pi) / (2.0 * math.pi))
+    return lon
+
+
+@cuda.jit
+def _webmerc_forward_cuda(lon, lat, lon0, false_easting, false_northing, radius, out_x, out_y):
+    """
+    網路麥卡托投影正算的CUDA版本，每個執行緒投影一個點，算式與_webmerc_forward相同。
+    """
+    i = cuda.grid(1)
+    if i < lon.shape[0]:
+        lam = math.radians(lon[i])
+        phi = math.radians(lat[i])
+        if math.isnan(lam) or math.isnan(phi):
+            out_x[i] = math.nan
+            out_y[i] = math.nan
+        elif abs(phi) - 0.5 * math.pi > _EPS12 or abs(lam) > _LON_MAX:
+            out_x[i] = math.inf
+            out_y[i] = math.inf
+        else:
+            out_x[i] = radius * _adjlon_device(lam - lon0) + false_easting
+            out_y[i] = radius * math.asinh(math.tan(phi)) + false_northing
+
+
+@cuda.jit
+def _webmerc_inverse_cuda(x, y, lon0, false_easting, false_northing, radius, out_lon, out_lat):
+    """
+    網路麥卡托投影反算的CUDA版本，每個執行緒投影一個點，算式與_webmerc_inverse相同。
+    """
+    i = cuda.grid(1)
+    if i < x.shape[0] and (math.isnan(x[i]) or math.isnan(y[i])):
+        out_lon[i] = math.nan
+        out_lat[i] = math.nan
+    elif i < x.shape[0]:
+        out_lon[i] = math.degrees(_adjlon_device((x[i] - false_easting) / radius + lon0))
+        out_lat[i] = math.degrees(math.atan(math.sinh((y[i] - false_northing) / radius)))
@@ -0,0 +1,263 @@
+# Author: ericlwc
+
+# numba加速核心的本體，載入numba約需0.1秒，因此只在kernels.find_kernel第一次需要核心時才import此模組
+
+import math
+
+from numba import njit, prange
+
+from coordinate_transform.kernels import _EPS10, _EPS12, _FASTMATH, _LON_MAX, _TMERC_ETA_MAX
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _aeqd_inverse(x, y, lon0, lat0, false_easting, false_northing, radius, out_lon, out_lat):
+    """
+    球體等距方位投影的反算（對應PROJ aeqd的s_inverse），結果以度為單位寫入out_lon、out_lat。
+    """
+    half_pi = 0.5 * math.pi
+    sin_lat0 = math.sin(lat0)
+    cos_lat0 = math.cos(lat0)
+    north_pole = abs(lat0 - half_pi) < _EPS10
+    south_pole = abs(lat0 + half_pi) < _EPS10
+    for i in prange(x.shape[0]):
+        if math.isnan(x[i]) or math.isnan(y[i]):
+            out_lon[i] = math.nan
+            out_lat[i] = math.nan
+            continue
+        xx = (x[i] - false_easting) / radius
+        yy = (y[i] - false_northing) / radius
+        c = math.sqrt(xx * xx + yy * yy)
+        if c > math.pi:
+            if c - _EPS10 > math.pi:
+                out_lon[i] = math.inf
+                out_lat[i] = math.inf
+                continue
+            c = math.pi
+        if c < _EPS10:
+            lat = lat0
+            lon = 0.0
+        elif north_pole:
+            lat = half_pi - c
+            lon = math.atan2(xx, -yy)
+        elif south_pole:
+            lat = c - half_pi
+            lon = math.atan2(xx, yy)
+        else:
+            sin_c = math.sin(c)
+            cos_c = math.cos(c)
+            lat = math.asin(max(-1.0, min(1.0, cos_c * sin_lat0 + yy * sin_c * cos_lat0 / c)))
+            yy = (cos_c - sin_lat0 * math.sin(lat)) * c
+            xx = xx * sin_c * cos_lat0
+            lon = 0.0 if yy == 0.0 else math.atan2(xx, yy)
+        out_lon[i] = math.degrees(_adjlon(lon + lon0))
+        out_lat[i] = math.degrees(lat)
+
+
+@njit(fastmath=_FASTMATH, cache=True)
+def _adjlon(lon):
+    # 將經度（弧度）正規化至[-π, π]
+    if abs(lon) > math.pi:
+        lon = lon - 2.0 * math.pi * math.floor((lon + math.pi) / (2.0 * math.pi))
+    return lon
+
+
+@njit(fastmath=_FASTMATH, cache=True)
+def _inside_domain(lam, phi):
+    # 經緯度（弧度）是否在PROJ正算的定義域內（NaN不在定義域內）
+    return abs(phi) - 0.5 * math.pi <= _EPS12 and abs(lam) <= _LON_MAX
+
+
+@njit(fastmath=_FASTMATH, cache=True)
+def _clenshaw_sin(coefficients, xi, eta):
+    # 以Clenshaw遞迴計算Σ coefficients[j] * sin(2(j+1)zeta)，zeta = xi + i*eta為複數，只需計算一次sin、cos
+    # 以實部、虛部分開計算，避免保留NaN語意的複數乘法（__muldc3）拖慢核心；回傳(實部, 虛部)
+    sin_2xi = math.sin(2.0 * xi)
+    cos_2xi = math.cos(2.0 * xi)
+    sinh_2eta = math.sinh(2.0 * eta)
+    cosh_2eta = math.cosh(2.0 * eta)
+    # 2cos(2zeta)的實部、虛部
+    cr = 2.0 * cos_2xi * cosh_2eta
+    ci = -2.0 * sin_2xi * sinh_2eta
+    b1r = 0.0
+    b1i = 0.0
+    b2r = 0.0
+    b2i = 0.0
+    for j in range(coefficients.shape[0] - 1, -1, -1):
+        b0r = cr * b1r - ci * b1i - b2r + coefficients[j]
+        b0i = cr * b1i + ci * b1r - b2i
+        b2r = b1r
+        b2i = b1i
+        b1r = b0r
+        b1i = b0i
+    # 乘上sin(2zeta)
+    sr = sin_2xi * cosh_2eta
+    si = cos_2xi * sinh_2eta
+    return sr * b1r - si * b1i, sr * b1i + si * b1r
+
+
+@njit(fastmath=_FASTMATH, cache=True)
+def _clenshaw_sin_real(coefficients, theta):
+    # 以Clenshaw遞迴計算Σ coefficients[j] * sin(2(j+1)theta)
+    cos_2theta = math.cos(2.0 * theta)
+    b1 = 0.0
+    b2 = 0.0
+    for j in range(coefficients.shape[0] - 1, -1, -1):
+        b0 = 2.0 * cos_2theta * b1 - b2 + coefficients[j]
+        b2 = b1
+        b1 = b0
+    return math.sin(2.0 * theta) * b1
+
+
+@njit(fastmath=_FASTMATH, cache=True)
+def _geodetic_tan(taup, e):
+    # 以牛頓法由等角緯度的正切值taup反求緯度的正切值（對應PROJ的pj_sinhpsi2tanphi）
+    e2m = 1.0 - e * e
+    tau = taup / e2m
+    for _ in range(10):
+        sigma = math.sinh(e * math.atanh(e * tau / math.sqrt(1.0 + tau * tau)))
+        taupa = tau * math.sqrt(1.0 + sigma * sigma) - sigma * math.sqrt(1.0 + tau * tau)
+        dtau = (taup - taupa) / math.sqrt(1.0 + taupa * taupa) * (1.0 + e2m * tau * tau) / (e2m * math.sqrt(1.0 + tau * tau))
+        tau += dtau
+        if abs(dtau) < 1e-15 * max(1.0, abs(tau)):
+            break
+    return tau
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _webmerc_forward(lon, lat, lon0, false_easting, false_northing, radius, out_x, out_y):
+    """
+    網路麥卡托投影的正算（對應PROJ webmerc的s_forward），經緯度以度為單位。
+    """
+    for i in prange(lon.shape[0]):
+        lam = math.radians(lon[i])
+        phi = math.radians(lat[i])
+        if not _inside_domain(lam, phi):
+            out_x[i] = math.nan if math.isnan(lam) or math.isnan(phi) else math.inf
+            out_y[i] = out_x[i]
+            continue
+        out_x[i] = radius * _adjlon(lam - lon0) + false_easting
+        out_y[i] = radius * math.asinh(math.tan(phi)) + false_northing
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _webmerc_inverse(x, y, lon0, false_easting, false_northing, radius, out_lon, out_lat):
+    """
+    網路麥卡托投影的反算（對應PROJ webmerc的s_inverse），結果以度為單位寫入out_lon、out_lat。
+    """
+    for i in prange(x.shape[0]):
+        if math.isnan(x[i]) or math.isnan(y[i]):
+            out_lon[i] = math.nan
+            out_lat[i] = math.nan
+            continue
+        out_lon[i] = math.degrees(_adjlon((x[i] - false_easting) / radius + lon0))
+        out_lat[i] = math.degrees(math.atan(math.sinh((y[i] - false_northing) / radius)))
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _tmerc_forward(lon, lat, lon0, k0a, false_easting, false_northing, to_conformal, alpha, out_x, out_y):
+    """
+    橢球體橫麥卡托投影的正算（Krüger級數，對應PROJ tmerc的Poder/Engsager演算法），經緯度以度為單位。
+    """
+    for i in prange(lon.shape[0]):
+        lam = math.radians(lon[i])
+        phi = math.radians(lat[i])
+        if not _inside_domain(lam, phi):
+            out_x[i] = math.nan if math.isnan(lam) or math.isnan(phi) else math.inf
+            out_y[i] = out_x[i]
+            continue
+        lam = _adjlon(lam - lon0)
+        taup = math.tan(phi + _clenshaw_sin_real(to_conformal, phi))
+        cos_lam = math.cos(lam)
+        xip = math.atan2(taup, cos_lam)
+        etap = math.asinh(math.sin(lam) / math.sqrt(taup * taup + cos_lam * cos_lam))
+        dxi, deta = _clenshaw_sin(alpha, xip, etap)
+        # 與PROJ相同，以加上級數修正後的eta判斷定義域（離中央經線約90度處etap可能為inf，級數修正後為NaN，同樣視為超出定義域）
+        eta = etap + deta
+        if not abs(eta) <= _TMERC_ETA_MAX:
+            out_x[i] = math.inf
+            out_y[i] = math.inf
+            continue
+        out_x[i] = k0a * eta + false_easting
+        out_y[i] = k0a * (xip + dxi) + false_northing
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _tmerc_inverse(x, y, lon0, k0a, false_easting, false_northing, to_geodetic, beta, out_lon, out_lat):
+    """
+    橢球體橫麥卡托投影的反算（Krüger級數，對應PROJ tmerc的Poder/Engsager演算法），結果以度為單位寫入out_lon、out_lat。
+    """
+    for i in prange(x.shape[0]):
+        if math.isnan(x[i]) or math.isnan(y[i]):
+            out_lon[i] = math.nan
+            out_lat[i] = math.nan
+            continue
+        xi = (y[i] - false_northing) / k0a
+        eta = (x[i] - false_easting) / k0a
+        if abs(eta) > _TMERC_ETA_MAX:
+            out_lon[i] = math.inf
+            out_lat[i] = math.inf
+            continue
+        dxi, deta = _clenshaw_sin(beta, xi, eta)
+        xip = xi - dxi
+        etap = eta - deta
+        sinh_etap = math.sinh(etap)
+        cos_xip = math.cos(xip)
+        chi = math.atan2(math.sin(xip), math.sqrt(sinh_etap * sinh_etap + cos_xip * cos_xip))
+        out_lon[i] = math.degrees(_adjlon(math.atan2(sinh_etap, cos_xip) + lon0))
+        out_lat[i] = math.degrees(chi + _clenshaw_sin_real(to_geodetic, chi))
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _lcc_forward(lon, lat, lon0, false_easting, false_northing, a, e, n, c, rho0, out_x, out_y):
+    """
+    橢球體蘭伯特正形圓錐投影的正算（對應PROJ lcc的forward），經緯度以度為單位。
+    """
+    half_pi = 0.5 * math.pi
+    for i in prange(lon.shape[0]):
+        lam = math.radians(lon[i])
+        phi = math.radians(lat[i])
+        if not _inside_domain(lam, phi):
+            out_x[i] = math.nan if math.isnan(lam) or math.isnan(phi) else math.inf
+            out_y[i] = out_x[i]
+            continue
+        if abs(abs(phi) - half_pi) < _EPS10:
+            if phi * n <= 0.0:
+                out_x[i] = math.inf
+                out_y[i] = math.inf
+                continue
+            rho = 0.0
+        else:
+            sin_phi = math.sin(phi)
+            ts = math.tan(0.5 * (half_pi - phi)) / ((1.0 - e * sin_phi) / (1.0 + e * sin_phi)) ** (0.5 * e)
+            rho = c * ts ** n
+        lam = _adjlon(lam - lon0) * n
+        out_x[i] = a * rho * math.sin(lam) + false_easting
+        out_y[i] = a * (rho0 - rho * math.cos(lam)) + false_northing
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _lcc_inverse(x, y, lon0, false_easting, false_northing, a, e, n, c, rho0, out_lon, out_lat):
+    """
+    橢球體蘭伯特正形圓錐投影的反算（對應PROJ lcc的inverse），結果以度為單位寫入out_lon、out_lat。
+    """
+    half_pi = 0.5 * math.pi
+    for i in prange(x.shape[0]):
+        if math.isnan(x[i]) or math.isnan(y[i]):
+            out_lon[i] = math.nan
+            out_lat[i] = math.nan
+            continue
+        xx = (x[i] - false_easting) / a
+        yy = rho0 - (y[i] - false_northing) / a
+        rho = math.sqrt(xx * xx + yy * yy)
+        if rho == 0.0:
+            out_lon[i] = math.degrees(lon0)
+            out_lat[i] = 90.0 if n > 0.0 else -90.0
+            continue
+        if n < 0.0:
+            rho = -rho
+            xx = -xx
+            yy = -yy
+        # rho = c * exp(-n * psi)，psi為等角（isometric）緯度，sinh(psi)即為等角緯度的正切值
+        psi = -math.log(rho / c) / n
+        out_lon[i] = math.degrees(_adjlon(math.atan2(xx, yy) / n + lon0))
+        out_lat[i] = math.degrees(math.atan(_geodetic_tan(math.sinh(psi), e)))
@@ -1,107 +1,469 @@
 # Author: ericlwc
 
+import inspect
 import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from pathlib import Path
 
-from GIS.management import *
+import numpy as np
+import pandas as pd
+import pyproj
+
+# geopandas、shapely與GIS.management只在建立點圖徵時才需要，於對應的函式中才import，避免只投影座標欄位的呼叫者負擔載入時間
 from GIS.lib.ProjParser import parse_crs
+from GIS.lib.TableIO import CsvStreamError, read_csv, read_csv_chunks, write_csv
+from coordinate_transform.kernels import find_kernel, stream_chunksize
+
+# 座標筆數超過此數量時才切塊並以多執行緒投影，避免小表格負擔建立執行緒的開銷
+_PARALLEL_THRESHOLD = 50_000
+
+# pyproj 3.2以上的Transformer.transform支援inplace，可讓PROJ直接將結果寫回輸入的緩衝區而不另外配置輸出陣列
+_TRANSFORM_INPLACE = "inplace" in inspect.signature(pyproj.Transformer.transform).parameters
+
+# 輸入表格超過此大小（bytes）時，改以分塊串流的方式讀取、投影並寫出，避免整個表格同時留在記憶體中
+_STREAM_THRESHOLD = 50 * 1024 * 1024
+
+# 分塊串流時每個區塊的列數（以GPU投影時會放大至超過kernels._CUDA_THRESHOLD列，見kernels.stream_chunksize）
+_STREAM_CHUNKSIZE = 200_000
+
+# 儲存方式：full寫出完整表格至out_table_path、inplace覆寫輸入表格、sidecar只將轉換過的座標欄位與列索引寫至out_table_path + ".coords.csv"
+_MODES = ("full", "inplace", "sidecar")
+
 
-def coordinate_transform(in_table_path, in_x_field, in_y_field, in_crs, out_table_path, out_x_field, out_y_field, out_crs):
+@dataclass(frozen=True, slots=True)
+class TransformSpec:
     """
-    將輸入表格中的座標欄位從一個座標系統轉換成另一個座標系統，並新增轉換過的座標欄位至已經帶有舊座標欄位的表格並儲存。這個功能不會異動原本的資料，除非 in_table_path 與 out_table_path 相同。
+    經過_validate檢查的座標欄位與座標系統，傳給投影與分塊串流的函式使用
+    """
+    in_x: str
+    in_y: str
+    out_x: str
+    out_y: str
+    in_crs: pyproj.crs.CRS
+    out_crs: pyproj.crs.CRS
+
+
+def coordinate_transform(in_table_path, in_x_field, in_y_field, in_crs, out_table_path, out_x_field, out_y_field, out_crs, use_geometry=False, return_df=True, dtype=np.float64, passthrough_columns=True, max_workers=None, overwrite=False, mode="full", precision=None, use_kernels=False):
+    """
+    將輸入表格中的座標欄位從一個座標系統轉換成另一個座標系統，並新增轉換過的座標欄位至已經帶有舊座標欄位的表格並儲存。這個功能不會異動原本的資料，除非 in_table_path 與 out_table_path 相同（或mode為"inplace"）且overwrite為True。
 
     Args:
         in_table_path (str): 輸入表格的路徑
         in_x_field (str): 輸入表格的x座標欄位
         in_y_field (str): 輸入表格的y座標欄位
         in_crs (int/str/CRS): 輸入表格的座標系統，可以是epsg代碼、wkt字串、prj檔路徑、pyproj.crs.CRS物件
-        out_table_path (str/None): 輸出表格的路徑，若與in_table_path相同則會覆蓋原本的檔案，若為None則不會儲存
+        out_table_path (str/None): 輸出表格的路徑，若與in_table_path相同則需設定overwrite=True才會覆蓋原本的檔案，若為None則不會儲存
         out_x_field (str): 輸出表格的x座標欄位，該欄位若不存在則創建，存在則覆蓋該欄位原本的內容
         out_y_field (str): 輸出表格的y座標欄位，該欄位若不存在則創建，存在則覆蓋該欄位原本的內容
         out_crs (int/str/CRS): 輸出表格的座標系統，可以是epsg代碼、wkt字串、prj檔路徑、pyproj.crs.CRS物件
+        use_geometry (bool): 是否沿用舊的流程，以XYTableToPoint建立點圖徵再以Project投影，預設為False（直接以pyproj.Transformer投影座標欄位，速度較快）
+        return_df (bool): 是否回傳轉換過的表格，預設為True。若輸入表格超過50MB且會儲存至另一個路徑，則會分塊串流處理，此時設為False可避免為了回傳而將整個表格留在記憶體中
+        dtype (numpy.dtype): 輸出座標欄位的資料型態，預設為numpy.float64。若不需要次公尺的精度，可設為numpy.float32使輸出欄位的記憶體用量減半（投影計算仍以float64進行）
+        passthrough_columns (bool): 是否保留輸入表格的其他欄位，預設為True。設為False時只讀取in_x_field與in_y_field，輸出表格只包含輸入與輸出的座標欄位，可省去解析其他欄位的時間
+        max_workers (int/None): 座標筆數超過50,000筆時，以多執行緒投影所使用的執行緒數量（也限制numba加速核心的執行緒數量），預設為None（使用CPU核心數）。設為1則不使用多執行緒
+        overwrite (bool): out_table_path與in_table_path相同或mode為"inplace"時，是否覆蓋原本的檔案，預設為False（拋出FileExistsError）
+        mode (str): 儲存方式，預設為"full"（寫出完整表格至out_table_path）。"inplace"直接以完整表格覆寫in_table_path（需設定overwrite=True且passthrough_columns不可為False，out_table_path會被忽略）；
+            "sidecar"不改寫任何完整表格，只將out_x_field、out_y_field與列索引寫至out_table_path + ".coords.csv"，下游可依列索引與原表格合併，寫出的資料量遠小於完整表格
+        precision (int/None): 寫出的座標欄位四捨五入至小數點後幾位，預設為None（完整精度）。例如經緯度取9位約為0.1公釐，可減少約一半寫出的位元組數；回傳的表格不受影響
+        use_kernels (bool): 是否以numba加速核心取代pyproj投影支援的座標系統組合（需安裝numba），預設為False。核心為PROJ演算法的近似實作，與PROJ的結果相差約1e-8公尺（投影定義域邊界附近可達1e-3公尺），
+            輸出的最後幾位數字因此與pyproj不同；每個行程第一次使用時需載入numba（約0.1至0.2秒），適合數百萬筆以上的表格
 
     Returns:
-        轉換過的padnas.DataFrame
+        轉換過的padnas.DataFrame，若return_df為False則回傳None
+
+    Raises:
+        FileExistsError: out_table_path與in_table_path相同或mode為"inplace"，且overwrite為False
+        ValueError: mode為"inplace"且passthrough_columns為False（覆寫後會失去其他欄位）
     """
-    # CHECK in_table_path
-    if not os.path.isfile(in_table_path):
+    # CHECK in_table_path，並將其正規化成絕對路徑（./a.csv與a.csv視為同一檔案），之後沿用這次stat的結果
+    try:
+        in_path = Path(in_table_path).resolve(strict=True)
+        in_stat = in_path.stat()
+    except (OSError, TypeError):
+        in_stat = None
+    if in_stat is None or not stat.S_ISREG(in_stat.st_mode):
         raise ValueError("in_table_path does not exist.")
+    in_table_path = str(in_path)
+
+    # CHECK if mode is valid
+    if mode not in _MODES:
+        raise ValueError("mode must be one of " + ", ".join(_MODES))
+
+    # CHECK inplace會以完整表格覆寫輸入表格，因此需保留其他欄位並明確允許覆寫
+    if mode == "inplace" and not passthrough_columns:
+        raise ValueError("mode=\"inplace\" rewrites in_table_path and requires passthrough_columns=True.")
+    if mode == "inplace" and not overwrite:
+        raise FileExistsError("mode=\"inplace\" overwrites in_table_path. Set overwrite=True to overwrite the input table.")
+
+    # 依mode決定要寫出的檔案，若為None則不儲存
+    if mode == "inplace":
+        save_path = in_table_path
+    elif mode == "sidecar" and out_table_path is not None:
+        save_path = f"{out_table_path}.coords.csv"
+    else:
+        save_path = out_table_path
+    sidecar = mode == "sidecar"
+
+    # CHECK if out_table_path would overwrite in_table_path（只需比較路徑，在讀取表格前檢查）
+    if mode == "full" and _is_same_path(out_table_path, in_path) and not overwrite:
+        raise FileExistsError("out_table_path is the same as in_table_path. Set overwrite=True to overwrite the input table.")
+
+    # READ in_table_path，若為大型表格且會儲存至另一個路徑，則改以分塊串流處理，此處只先讀取欄位名稱供下方檢查使用
+    stream = (
+        not use_geometry
+        and save_path is not None
+        and not _is_same_path(save_path, in_path)
+        and in_stat.st_size > _STREAM_THRESHOLD
+        )
+    # 若不保留其他欄位，則只讀取in_x_field與in_y_field，不解析其他欄位
+    usecols = None if passthrough_columns else [in_x_field, in_y_field]
+    if stream:
+        df = pd.read_csv(in_table_path, nrows=0)
+    else:
+        df = read_csv(in_table_path, usecols=usecols)
+
+    # CHECK 檢查欄位、座標系統與輸出路徑
+    spec = _validate(df.columns, in_x_field, in_y_field, in_crs, out_table_path, out_x_field, out_y_field, out_crs)
+
+    # CHECK if max_workers is valid
+    if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+        raise ValueError("max_workers must be a positive integer")
+
+    # CHECK if precision is valid
+    if precision is not None and (not isinstance(precision, int) or precision < 0):
+        raise ValueError("precision must be a non-negative integer")
+
+    if use_geometry:
+        import shapely
+
+        from GIS.management import Project, XYTableToPoint
+
+        # PROCESS XYTableToPoint工具將csv轉成shp
+        df = XYTableToPoint(
+            in_table=df, 
+            out_feature_class=None, 
+            x_field=spec.in_x,
+            y_field=spec.in_y,
+            coordinate_system=spec.in_crs
+            )
+
+        # PROCESS 將他投影成經緯度座標系統
+        df = Project(
+            in_dataset=df,
+            out_dataset=None,
+            out_coor_system=spec.out_crs
+            )
+
+        # PROCESS 將geometry欄位轉成x、y欄位，並刪除geometry欄位
+        # shapely 2.0以上以get_coordinates一次取出所有座標；若有空的點圖徵（取出的座標數量不符），則逐點讀取x、y
+        geometry = df['geometry'].to_numpy()
+        coords = shapely.get_coordinates(geometry) if hasattr(shapely, "get_coordinates") else None
+        if coords is not None and len(coords) == len(geometry):
+            df[spec.out_x] = coords[:, 0].astype(dtype)
+            df[spec.out_y] = coords[:, 1].astype(dtype)
+        else:
+            df[spec.out_x] = df['geometry'].x.astype(dtype)
+            df[spec.out_y] = df['geometry'].y.astype(dtype)
+        df.drop(columns=['geometry'], inplace=True)
+    elif stream:
+        # PROCESS & SAVE 分塊讀取表格，逐塊投影座標欄位後附加寫入out_table_path
+        return _stream_transform(in_table_path, spec, save_path, return_df, dtype, usecols, max_workers, sidecar, precision, use_kernels)
+    else:
+        # PROCESS 以pyproj.Transformer直接對x、y欄位的numpy陣列進行投影轉換，不建立點圖徵與geometry欄位
+        _transform_columns(df, spec, dtype, max_workers, use_kernels)
+
+    # SAVE 將轉換過的表格（sidecar則只有座標欄位與列索引）儲存成csv，若save_path為None則不儲存
+    if save_path is not None:
+        write_csv(_output_frame(df, spec, sidecar, precision), save_path, index=sidecar)
+
+    return df if return_df else None
+
+
+def coordinate_transform_geo(in_table_path, in_x_field, in_y_field, in_crs, out_x_field, out_y_field, out_crs, dtype=np.float64, passthrough_columns=True, max_workers=None, use_kernels=False):
+    """
+    將輸入表格中的座標欄位從一個座標系統轉換成另一個座標系統，並以轉換過的座標建立點圖徵，回傳帶有geometry欄位的GeoDataFrame。
+    座標直接以pyproj.Transformer投影後，一次建立所有點圖徵，不經過XYTableToPoint與Project。這個功能不會儲存任何檔案。
+
+    Args:
+        in_table_path (str): 輸入表格的路徑
+        in_x_field (str): 輸入表格的x座標欄位
+        in_y_field (str): 輸入表格的y座標欄位
+        in_crs (int/str/CRS): 輸入表格的座標系統，可以是epsg代碼、wkt字串、prj檔路徑、pyproj.crs.CRS物件
+        out_x_field (str): 輸出表格的x座標欄位，該欄位若不存在則創建，存在則覆蓋該欄位原本的內容
+        out_y_field (str): 輸出表格的y座標欄位，該欄位若不存在則創建，存在則覆蓋該欄位原本的內容
+        out_crs (int/str/CRS): 輸出表格的座標系統，也是回傳的GeoDataFrame的座標系統，可以是epsg代碼、wkt字串、prj檔路徑、pyproj.crs.CRS物件
+        dtype (numpy.dtype): 輸出座標欄位的資料型態，預設為numpy.float64（點圖徵一律以float64儲存）
+        passthrough_columns (bool): 是否保留輸入表格的其他欄位，預設為True
+        max_workers (int/None): 座標筆數超過50,000筆時，以多執行緒投影所使用的執行緒數量，預設為None（使用CPU核心數）
+        use_kernels (bool): 是否以numba加速核心（PROJ的近似實作）投影，預設為False
+
+    Returns:
+        轉換過的geopandas.GeoDataFrame
+    """
+    # PROCESS 投影座標欄位，不儲存
+    df = coordinate_transform(
+        in_table_path=in_table_path,
+        in_x_field=in_x_field,
+        in_y_field=in_y_field,
+        in_crs=in_crs,
+        out_table_path=None,
+        out_x_field=out_x_field,
+        out_y_field=out_y_field,
+        out_crs=out_crs,
+        dtype=dtype,
+        passthrough_columns=passthrough_columns,
+        max_workers=max_workers,
+        use_kernels=use_kernels
+        )
+
+    import geopandas as gpd
+    import shapely
+
+    # PROCESS 以轉換過的座標一次建立所有點圖徵（shapely 2.0以上提供向量化的shapely.points，可在一次C呼叫中建立所有點圖徵）
+    x = df[out_x_field].to_numpy(dtype=np.float64)
+    y = df[out_y_field].to_numpy(dtype=np.float64)
+    geometry = shapely.points(x, y) if hasattr(shapely, "points") else gpd.points_from_xy(x, y)
+
+    return gpd.GeoDataFrame(df, geometry=geometry, crs=parse_crs(out_crs))
+
+
+def _validate(columns, in_x_field, in_y_field, in_crs, out_table_path, out_x_field, out_y_field, out_crs):
+    """
+    檢查coordinate_transform的欄位、座標系統與輸出路徑，並解析座標系統。
+
+    Args:
+        columns (pandas.Index): 輸入表格的欄位名稱
+        其餘參數與coordinate_transform相同
 
-    # READ in_table_path
-    df = pd.read_csv(in_table_path)
+    Returns:
+        TransformSpec
+    """
+    # 以set查詢欄位是否存在
+    columns = set(columns)
 
     # CHECK if in_x_field == in_y_field
     if in_x_field == in_y_field:
         raise ValueError("in_x_field same as in_y_field")
-    
+
     # CHECK if in_x_field is in df.columns
     if not isinstance(in_x_field, str):
         raise ValueError("in_x_field must be a string")
-    if in_x_field not in df.columns:
+    if in_x_field not in columns:
         raise ValueError("in_x_field does not exist in the input table")
-    
+
     # CHECK if in_y_field is in df.columns
     if not isinstance(in_y_field, str):
         raise ValueError("in_y_field must be a string")
-    if in_y_field not in df.columns:
+    if in_y_field not in columns:
         raise ValueError("in_y_field does not exist in the input table")
-    
+
     # CHECK if in_crs is valid
     in_crs = parse_crs(in_crs)
+    if in_crs is None:
+        raise ValueError("in_crs must not be None")
 
     # CHECK if out_table_path is valid
-    if out_table_path is None:
-        pass
-    elif not isinstance(out_table_path, str):
+    if out_table_path is not None and not isinstance(out_table_path, str):
         raise ValueError("out_table_path must be a string")
 
     # CHECK if out_x_field == out_y_field
     if out_x_field == out_y_field:
         raise ValueError("out_x_field same as out_y_field")
-    
+
     # CHECK if out_x_field is valid
     if not isinstance(out_x_field, str):
         raise ValueError("out_x_field must be a string")
-    
+
     # CHECK if out_y_field is valid
     if not isinstance(out_y_field, str):
         raise ValueError("out_y_field must be a string")
-    
+
     # CHECK if out_crs is valid
     out_crs = parse_crs(out_crs)
+    if out_crs is None:
+        raise ValueError("out_crs must not be None")
 
-    # PROCESS XYTableToPoint工具將csv轉成shp
-    df = XYTableToPoint(
-        in_table=df, 
-        out_feature_class=None, 
-        x_field=in_x_field,
-        y_field=in_y_field,
-        coordinate_system=in_crs
-        )
+    return TransformSpec(in_x_field, in_y_field, out_x_field, out_y_field, in_crs, out_crs)
 
-    # PROCESS 將他投影成經緯度座標系統
-    df = Project(
-        in_dataset=df,
-        out_dataset=None,
-        out_coor_system=out_crs
-        )
 
-    # PROCESS 將geometry欄位轉成x、y欄位，並刪除geometry欄位
-    df[out_x_field] = df['geometry'].x
-    df[out_y_field] = df['geometry'].y
-    df.drop(columns=['geometry'], inplace=True)
-
-    # SAVE 將轉換過的表格儲存成csv
-    if out_table_path is None:
-        pass
-    elif out_table_path == in_table_path:
-        # print warning message in yellow color text style
-        print('\033[33m' + 'Warning: The output table path is the same as the input table path. Are you sure you want to overwrite? (Y/n)' + '\033[0m')
-        save_even_path_is_same = input() == "Y"
-        if save_even_path_is_same: 
-            df.to_csv(out_table_path, index=False)
-        else: 
-            raise Exception('The original file will not be overwritten.')
+def _transform_columns(df, spec, dtype, max_workers=None, use_kernels=False):
+    """
+    投影df的spec.in_x、spec.in_y欄位，並將結果以dtype型態寫入（新增或覆蓋）spec.out_x、spec.out_y欄位。
+    若use_kernels為True且這組座標系統有對應的numba加速核心（如球體上的等距方位投影反算），則改以該核心投影。
+    """
+    # 輸入與輸出的座標系統相同時不需投影，直接複製座標欄位
+    if spec.in_crs.equals(spec.out_crs):
+        df[spec.out_x] = df[spec.in_x].to_numpy(dtype=np.float64, copy=True).astype(dtype, copy=False)
+        df[spec.out_y] = df[spec.in_y].to_numpy(dtype=np.float64, copy=True).astype(dtype, copy=False)
+        return
+
+    kernel = find_kernel(spec.in_crs, spec.out_crs) if use_kernels else None
+    if kernel is not None:
+        out_x, out_y = kernel(df[spec.in_x].to_numpy(), df[spec.in_y].to_numpy(), max_workers)
     else:
-        df.to_csv(out_table_path, index=False)
+        transformer = _get_transformer(spec.in_crs, spec.out_crs)
+        out_x, out_y = _transform_xy(transformer, df[spec.in_x].to_numpy(), df[spec.in_y].to_numpy(), max_workers)
+    df[spec.out_x] = out_x.astype(dtype, copy=False)
+    df[spec.out_y] = out_y.astype(dtype, copy=False)
+
+
+def _is_same_path(path, in_path):
+    # 比較正規化後的路徑，path不是字串（None或不合法）時視為不同
+    return isinstance(path, str) and Path(path).resolve() == in_path
+
+
+def _output_frame(df, spec, sidecar, precision=None):
+    # sidecar只寫出轉換過的座標欄位（與列索引），否則寫出完整表格；若有指定precision，則寫出的座標欄位四捨五入至小數點後precision位（不異動df）
+    frame = df[[spec.out_x, spec.out_y]] if sidecar else df
+    if precision is not None:
+        frame = frame.assign(**{field: frame[field].round(precision) for field in (spec.out_x, spec.out_y)})
+    return frame
+
+
+def _stream_transform(in_table_path, spec, out_table_path, return_df, dtype, usecols, max_workers, sidecar=False, precision=None, use_kernels=False):
+    """
+    以每塊_STREAM_CHUNKSIZE列的方式讀取in_table_path（只讀取usecols欄位，若為None則讀取全部欄位），逐塊投影座標欄位後附加寫入out_table_path，記憶體中只保留一個區塊。
+    若sidecar為True，則只寫出轉換過的座標欄位與列索引（列索引跨區塊連續編號）；若有指定precision，則寫出的座標欄位四捨五入至小數點後precision位。
+    是否使用numba加速核心只由use_kernels決定（與不串流時相同），同一個輸入不論是否串流都寫出相同的座標。
+    若使用的核心可在GPU上投影且GPU可用，則區塊放大至超過kernels._CUDA_THRESHOLD列，讓每個區塊都達到改以GPU投影的筆數。
+    各區塊的欄位型態與第一個區塊相同（必要時以較寬的型態重新處理），寫出的表格與不串流時相同。
+
+    Returns:
+        串接所有區塊的pandas.DataFrame，若return_df為False則回傳None（不保留已寫出的區塊）
+    """
+    kernel = find_kernel(spec.in_crs, spec.out_crs) if use_kernels and not spec.in_crs.equals(spec.out_crs) else None
+    chunksize = stream_chunksize(kernel, _STREAM_CHUNKSIZE)
+
+    # pyarrow的串流讀取器只依第一個區塊推斷欄位型態，若之後的區塊不符合，則改以pandas從頭重新處理並覆寫已寫出的部分
+    # 各區塊的欄位型態須與第一個區塊相同（見_fit_dtypes），若之後的區塊需要較寬的型態，則以較寬的型態從頭重新處理
+    use_pyarrow = True
+    dtypes = {}
+    string_columns = []
+    while True:
+        chunks = []
+        start = 0
+        fitted = True
+        try:
+            for i, chunk in enumerate(read_csv_chunks(in_table_path, chunksize, usecols=usecols, use_pyarrow=use_pyarrow, string_columns=string_columns)):
+                fitted = _fit_dtypes(chunk, dtypes, string_columns)
+                if not fitted:
+                    break
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                start += len(chunk)
+                _transform_columns(chunk, spec, dtype, max_workers, use_kernels)
+                write_csv(_output_frame(chunk, spec, sidecar, precision), out_table_path, append=i > 0, index=sidecar)
+                if return_df:
+                    chunks.append(chunk)
+        except CsvStreamError:
+            if not use_pyarrow:
+                raise
+            use_pyarrow = False
+            continue
+        if fitted:
+            break
+
+    if not return_df:
+        return None
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _fit_dtypes(chunk, dtypes, string_columns):
+    """
+    將分塊串流的chunk的欄位轉成dtypes記錄的型態（尚未記錄的欄位以chunk的型態記錄），使各區塊寫出的格式與整個表格一次讀取時相同（如整數欄位不會在某些區塊寫成1.0）。
+    若chunk的欄位需要較寬的型態，數值欄位將dtypes更新為可容納兩者的型態（如int64與float64為float64）、有缺值的布林欄位更新為object，其他欄位則加入string_columns以文字重新讀取，並回傳False。
+
+    Returns:
+        chunk是否符合dtypes(bool)，False表示須以更新後的dtypes、string_columns從頭重新讀取
+    """
+    fitted = True
+    for column, chunk_dtype in chunk.dtypes.items():
+        target = dtypes.setdefault(column, chunk_dtype)
+        if chunk_dtype == target:
+            continue
+        numeric = all(isinstance(d, np.dtype) and d.kind in "iuf" for d in (chunk_dtype, target))
+        if numeric and np.result_type(target, chunk_dtype) == target:
+            chunk[column] = chunk[column].astype(target)
+            continue
+        # 布林欄位有缺值時pandas以object型態保存（True、False與NaN），與其他區塊的布林值合併成object型態
+        boolean = target in (bool, object) and _is_boolean(chunk[column])
+        if boolean and target == object:
+            chunk[column] = chunk[column].astype(object)
+            continue
+        if numeric:
+            dtypes[column] = np.result_type(target, chunk_dtype)
+        elif boolean:
+            dtypes[column] = np.dtype(object)
+        else:
+            del dtypes[column]
+            string_columns.append(column)
+        fitted = False
+    return fitted
+
+
+def _is_boolean(series):
+    # 只含布林值與缺值的欄位
+    return series.dtype == bool or series.dropna().map(type).eq(bool).all()
+
+
+# 以lru_cache快取投影轉換器，對同一組座標系統重複呼叫時不需重新建立PROJ的轉換流程（pyproj.crs.CRS以其WKT作為雜湊值）
+@lru_cache(maxsize=32)
+def _get_transformer(in_crs, out_crs):
+    return pyproj.Transformer.from_crs(in_crs, out_crs, always_xy=True)
+
+
+def _transform_xy(transformer, x, y, max_workers=None):
+    """
+    以transformer投影x、y座標陣列。座標筆數夠多時切成與執行緒數量相同的連續區塊，並以多執行緒同時投影（PROJ在轉換時會釋放GIL）。
+    pyproj支援inplace時，先將x、y複製成一份連續的float64陣列，再讓各區塊直接原地寫回這份陣列，傳入的x、y不會被異動。
+
+    Args:
+        transformer (pyproj.Transformer): 投影轉換器
+        x (numpy.ndarray): x座標陣列
+        y (numpy.ndarray): y座標陣列
+        max_workers (int/None): 執行緒數量，若為None則使用CPU核心數
+
+    Returns:
+        投影後的(x, y)座標陣列
+    """
+    workers = max_workers or os.cpu_count() or 1
+    parallel = len(x) > _PARALLEL_THRESHOLD and workers > 1
+
+    # pyproj < 3.2: 預先配置整個輸出陣列，各區塊投影後直接寫入對應的範圍，不需再串接
+    if not _TRANSFORM_INPLACE:
+        if not parallel:
+            return transformer.transform(x, y)
+        out_x = np.empty(len(x), dtype=np.float64)
+        out_y = np.empty(len(y), dtype=np.float64)
+        bounds = np.linspace(0, len(x), workers + 1).astype(np.int64)
+
+        def transform_slice(start, end):
+            out_x[start:end], out_y[start:end] = transformer.transform(x[start:end], y[start:end])
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(transform_slice, bounds[:-1], bounds[1:]))
+        return out_x, out_y
+
+    # 複製一次作為輸出緩衝區，各區塊為其連續的view，PROJ直接原地寫回，不需再串接
+    out_x = np.array(x, dtype=np.float64, order="C")
+    out_y = np.array(y, dtype=np.float64, order="C")
+    if not parallel:
+        transformer.transform(out_x, out_y, inplace=True)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(partial(transformer.transform, inplace=True), np.array_split(out_x, workers), np.array_split(out_y, workers)))
+
+    return out_x, out_y
+
+
+def _clear_cache():
+    # 清除快取的投影轉換器、numba加速核心與座標系統解析結果
+    _get_transformer.cache_clear()
+    find_kernel.cache_clear()
+    parse_crs.cache_clear()
+
 
-    return df
\ No newline at end of file
+# 清除快取的投影轉換器、numba加速核心與座標系統解析結果
+coordinate_transform.clear_cache = _clear_cache
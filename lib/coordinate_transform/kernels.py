@@ -0,0 +1,383 @@
+# Author: ericlwc
+
+import math
+from functools import lru_cache
+
+import numpy as np
+import pyproj
+
+# 與PROJ相同的容許誤差，用於判斷原點與極點
+_EPS10 = 1e-10
+
+# numba核心使用的fastmath旗標，不含nnan、ninf，使NaN與inf的判斷仍然有效（輸入NaN時與PROJ相同輸出NaN）
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+# 與PROJ相同的經緯度定義域：緯度超出±90度（容許誤差1e-12弧度）或經度超出±10弧度時，PROJ的正算回傳錯誤，此處則輸出inf
+_EPS12 = 1e-12
+_LON_MAX = 10.0
+
+# 與PROJ相同的橫麥卡托投影定義域，超出時（約為離中央經線90度）PROJ會回傳錯誤，此處則輸出inf
+_TMERC_ETA_MAX = 2.623395162778
+
+# 座標筆數超過此數量時才改以GPU投影，較少的座標不值得負擔主記憶體與GPU之間的複製
+_CUDA_THRESHOLD = 1_000_000
+
+# 每個CUDA block的執行緒數量
+_CUDA_BLOCK_SIZE = 256
+
+
+# 以lru_cache快取找到的核心，分塊串流時每個區塊都會查詢一次（pyproj.crs.CRS以其WKT作為雜湊值）
+@lru_cache(maxsize=32)
+def find_kernel(in_crs, out_crs):
+    """
+    尋找可取代pyproj.Transformer的numba加速核心。目前支援：
+    - 球體上的等距方位投影（Azimuthal Equidistant）反算成其經緯度座標
+    - 網路麥卡托投影（Popular Visualisation Pseudo Mercator，如EPSG:3857）與其經緯度座標互轉
+    - 橫麥卡托投影（Transverse Mercator，如UTM的EPSG:326xx、327xx）與其經緯度座標互轉
+    - 雙標準緯線的蘭伯特正形圓錐投影（Lambert Conic Conformal (2SP)，如EPSG:2154）與其經緯度座標互轉
+    核心為PROJ演算法的近似實作：NaN、inf與定義域的判斷與PROJ相同，座標與PROJ相差約1e-8公尺（定義域邊界附近可達1e-3公尺）
+
+    Args:
+        in_crs (pyproj.crs.CRS): 輸入的座標系統
+        out_crs (pyproj.crs.CRS): 輸出的座標系統
+
+    Returns:
+        接受x、y座標陣列（與選用的max_workers，限制核心使用的執行緒數量）並回傳(x, y)座標陣列的函式；若未安裝numba或沒有對應的核心則回傳None
+    """
+    if _load_numba_kernels() is None:
+        return None
+
+    kernel = _find_aeqd_inverse(in_crs, out_crs)
+    if kernel is not None:
+        return kernel
+
+    # 投影座標反算成其經緯度座標
+    projection = _projection_params(in_crs, out_crs)
+    if projection is not None:
+        method, params, ellipsoid = projection
+        if method in _INVERSE_SETUPS:
+            return _INVERSE_SETUPS[method](params, ellipsoid)
+
+    # 經緯度座標正算成投影座標
+    projection = _projection_params(out_crs, in_crs)
+    if projection is not None:
+        method, params, ellipsoid = projection
+        if method in _FORWARD_SETUPS:
+            return _FORWARD_SETUPS[method](params, ellipsoid)
+
+    return None
+
+
+def _find_aeqd_inverse(in_crs, out_crs):
+    # CHECK in_crs is an Azimuthal Equidistant projection in metres on a sphere
+    operation = in_crs.coordinate_operation
+    if operation is None or operation.method_name != "Azimuthal Equidistant":
+        return None
+    if in_crs.ellipsoid is None or in_crs.ellipsoid.semi_minor_metre != in_crs.ellipsoid.semi_major_metre:
+        return None
+    if any(axis.unit_conversion_factor != 1.0 for axis in in_crs.axis_info):
+        return None
+
+    # CHECK out_crs is the geographic coordinate system of the sphere (or WGS1984, which PROJ reaches without a datum shift)
+    geodetic_crs = in_crs.geodetic_crs
+    if not (out_crs.equals(geodetic_crs, ignore_axis_order=True) or out_crs.equals(_wgs84())):
+        return None
+    if geodetic_crs.prime_meridian.longitude != 0.0:
+        return None
+
+    params = {param.code: param.value * param.unit_conversion_factor for param in operation.params}
+    if not {"8801", "8802", "8806", "8807"} <= params.keys():
+        return None
+    lat0, lon0 = params["8801"], params["8802"]
+    false_easting, false_northing = params["8806"], params["8807"]
+    radius = in_crs.ellipsoid.semi_major_metre
+
+    return _make_kernel(_load_numba_kernels()._aeqd_inverse, lon0, lat0, false_easting, false_northing, radius)
+
+
+# numba為選用套件，未安裝時不提供任何加速核心，一律交由pyproj.Transformer投影；載入numba約需0.1秒，因此第一次需要核心時才import
+@lru_cache(maxsize=None)
+def _load_numba_kernels():
+    try:
+        from coordinate_transform import _numba_kernels
+    except ImportError:
+        return None
+    return _numba_kernels
+
+
+# 球體等距方位投影反算的輸出座標系統（WGS1984經緯度，經度在前），第一次使用時才建立
+@lru_cache(maxsize=None)
+def _wgs84():
+    return pyproj.crs.CRS.from_epsg(4326)
+
+
+def _projection_params(projected_crs, geographic_crs):
+    """
+    若projected_crs為以公尺為單位的投影座標系統，且geographic_crs正是其經緯度座標系統（不需基準轉換），
+    則回傳(投影方法名稱, 以EPSG參數代碼為鍵且角度已換成弧度的參數, 橢球體)，否則回傳None。
+    """
+    operation = projected_crs.coordinate_operation
+    if operation is None or not projected_crs.is_projected:
+        return None
+    if any(axis.unit_conversion_factor != 1.0 for axis in projected_crs.axis_info):
+        return None
+
+    geodetic_crs = projected_crs.geodetic_crs
+    if not geographic_crs.is_geographic or not geographic_crs.equals(geodetic_crs, ignore_axis_order=True):
+        return None
+    if geodetic_crs.prime_meridian.longitude != 0.0 or len(geographic_crs.axis_info) != 2:
+        return None
+
+    params = {param.code: param.value * param.unit_conversion_factor for param in operation.params}
+    return operation.method_name, params, projected_crs.ellipsoid
+
+
+def _make_kernel(function, *params, cuda_function=None):
+    # 將x、y轉成連續的float64陣列並配置輸出陣列後，呼叫numba核心function；若有對應的CUDA核心（_cuda_kernels中的函式名稱）且座標筆數夠多、GPU可用，則改呼叫該核心
+    def kernel(x, y, max_workers=None):
+        x = np.ascontiguousarray(x, dtype=np.float64)
+        y = np.ascontiguousarray(y, dtype=np.float64)
+        if cuda_function is not None and x.shape[0] > _CUDA_THRESHOLD and _load_cuda_kernels() is not None:
+            return _launch_cuda(getattr(_load_cuda_kernels(), cuda_function), x, y, params)
+        out_x = np.empty_like(x)
+        out_y = np.empty_like(y)
+        if max_workers is None:
+            function(x, y, *params, out_x, out_y)
+            return out_x, out_y
+
+        # 暫時將numba的執行緒數量限制為max_workers（不可超過numba啟動時的執行緒數量），呼叫後再還原
+        import numba
+        threads = numba.get_num_threads()
+        numba.set_num_threads(min(max_workers, numba.config.NUMBA_NUM_THREADS))
+        try:
+            function(x, y, *params, out_x, out_y)
+        finally:
+            numba.set_num_threads(threads)
+        return out_x, out_y
+
+    kernel.cuda_function = cuda_function
+    return kernel
+
+
+def stream_chunksize(kernel, chunksize):
+    """
+    分塊串流時每個區塊的列數。kernel有對應的CUDA核心且GPU可用時，將區塊放大至超過_CUDA_THRESHOLD列，使每個區塊都改以GPU投影。
+
+    Args:
+        kernel: find_kernel回傳的核心，None表示以pyproj.Transformer投影
+        chunksize (int): 不使用GPU時的區塊列數
+
+    Returns:
+        區塊列數(int)
+    """
+    if kernel is None or kernel.cuda_function is None or _load_cuda_kernels() is None:
+        return chunksize
+    return max(chunksize, _CUDA_THRESHOLD + 1)
+
+
+# numba.cuda需要支援CUDA的GPU與驅動程式，未安裝或沒有GPU時回傳None而只使用CPU核心
+# 只檢查一次是否有可用的GPU（cuda.is_available()需要初始化驅動程式），且只在有對應的CUDA核心時才import numba.cuda
+@lru_cache(maxsize=None)
+def _load_cuda_kernels():
+    try:
+        from numba import cuda
+    except ImportError:
+        return None
+    if not cuda.is_available():
+        return None
+    from coordinate_transform import _cuda_kernels
+    return _cuda_kernels
+
+
+def _launch_cuda(cuda_function, x, y, params):
+    # 將x、y複製到GPU，每個執行緒投影一個點，再將結果複製回主記憶體
+    from numba import cuda
+    d_x = cuda.to_device(x)
+    d_y = cuda.to_device(y)
+    d_out_x = cuda.device_array_like(d_x)
+    d_out_y = cuda.device_array_like(d_y)
+    blocks = (x.shape[0] + _CUDA_BLOCK_SIZE - 1) // _CUDA_BLOCK_SIZE
+    cuda_function[blocks, _CUDA_BLOCK_SIZE](d_x, d_y, *params, d_out_x, d_out_y)
+    return d_out_x.copy_to_host(), d_out_y.copy_to_host()
+
+
+def _webmerc_setup(params, ellipsoid):
+    # 網路麥卡托投影一律以橢球體的長半徑作為球體半徑
+    if not {"8802", "8806", "8807"} <= params.keys():
+        return None
+    return params["8802"], params["8806"], params["8807"], ellipsoid.semi_major_metre
+
+
+def _setup_webmerc_forward(params, ellipsoid):
+    setup = _webmerc_setup(params, ellipsoid)
+    if setup is None:
+        return None
+    return _make_kernel(_load_numba_kernels()._webmerc_forward, *setup, cuda_function="_webmerc_forward_cuda")
+
+
+def _setup_webmerc_inverse(params, ellipsoid):
+    setup = _webmerc_setup(params, ellipsoid)
+    if setup is None:
+        return None
+    return _make_kernel(_load_numba_kernels()._webmerc_inverse, *setup, cuda_function="_webmerc_inverse_cuda")
+
+
+def _tmerc_setup(params, ellipsoid):
+    """
+    計算橫麥卡托投影Krüger級數（至n的6次方，與PROJ的Poder/Engsager演算法相同）所需的常數。
+
+    Returns:
+        (中央經線, k0乘以子午線弧長常數, 東偏移, 北偏移（已扣除原點緯度的子午線弧長）, 緯度與等角緯度互轉的級數係數, Krüger級數係數)
+        其中級數係數為(正算, 反算)的tuple
+    """
+    if not {"8801", "8802", "8805", "8806", "8807"} <= params.keys():
+        return None
+    lat0, lon0, k0 = params["8801"], params["8802"], params["8805"]
+    false_easting, false_northing = params["8806"], params["8807"]
+
+    a = ellipsoid.semi_major_metre
+    f = 1.0 / ellipsoid.inverse_flattening if ellipsoid.inverse_flattening else 0.0
+    n = f / (2.0 - f)
+    e = math.sqrt(f * (2.0 - f))
+    n2, n3, n4, n5, n6 = n ** 2, n ** 3, n ** 4, n ** 5, n ** 6
+    k0a = k0 * a / (1.0 + n) * (1.0 + n2 / 4.0 + n4 / 64.0 + n6 / 256.0)
+    alpha = np.array([
+        n / 2.0 - 2.0 * n2 / 3.0 + 5.0 * n3 / 16.0 + 41.0 * n4 / 180.0 - 127.0 * n5 / 288.0 + 7891.0 * n6 / 37800.0,
+        13.0 * n2 / 48.0 - 3.0 * n3 / 5.0 + 557.0 * n4 / 1440.0 + 281.0 * n5 / 630.0 - 1983433.0 * n6 / 1935360.0,
+        61.0 * n3 / 240.0 - 103.0 * n4 / 140.0 + 15061.0 * n5 / 26880.0 + 167603.0 * n6 / 181440.0,
+        49561.0 * n4 / 161280.0 - 179.0 * n5 / 168.0 + 6601661.0 * n6 / 7257600.0,
+        34729.0 * n5 / 80640.0 - 3418889.0 * n6 / 1995840.0,
+        212378941.0 * n6 / 319334400.0,
+        ])
+    beta = np.array([
+        n / 2.0 - 2.0 * n2 / 3.0 + 37.0 * n3 / 96.0 - n4 / 360.0 - 81.0 * n5 / 512.0 + 96199.0 * n6 / 604800.0,
+        n2 / 48.0 + n3 / 15.0 - 437.0 * n4 / 1440.0 + 46.0 * n5 / 105.0 - 1118711.0 * n6 / 3870720.0,
+        17.0 * n3 / 480.0 - 37.0 * n4 / 840.0 - 209.0 * n5 / 4480.0 + 5569.0 * n6 / 90720.0,
+        4397.0 * n4 / 161280.0 - 11.0 * n5 / 504.0 - 830251.0 * n6 / 7257600.0,
+        4583.0 * n5 / 161280.0 - 108847.0 * n6 / 3991680.0,
+        20648693.0 * n6 / 638668800.0,
+        ])
+
+    to_conformal, to_geodetic = _latitude_series(e)
+
+    # 原點緯度不為0時，扣除中央經線上該緯度的子午線弧長
+    xi0 = math.atan(_conformal_tan(math.tan(lat0), e))
+    xi0 = xi0 + sum(alpha[j] * math.sin(2.0 * (j + 1) * xi0) for j in range(6))
+    false_northing = false_northing - k0a * xi0
+
+    return lon0, k0a, false_easting, false_northing, (to_conformal, to_geodetic), (alpha, beta)
+
+
+def _setup_tmerc_forward(params, ellipsoid):
+    setup = _tmerc_setup(params, ellipsoid)
+    if setup is None:
+        return None
+    lon0, k0a, false_easting, false_northing, latitude_series, kruger_series = setup
+    return _make_kernel(_load_numba_kernels()._tmerc_forward, lon0, k0a, false_easting, false_northing, latitude_series[0], kruger_series[0])
+
+
+def _setup_tmerc_inverse(params, ellipsoid):
+    setup = _tmerc_setup(params, ellipsoid)
+    if setup is None:
+        return None
+    lon0, k0a, false_easting, false_northing, latitude_series, kruger_series = setup
+    return _make_kernel(_load_numba_kernels()._tmerc_inverse, lon0, k0a, false_easting, false_northing, latitude_series[1], kruger_series[1])
+
+
+def _lcc_setup(params, ellipsoid):
+    """
+    計算雙標準緯線的蘭伯特正形圓錐投影（對應PROJ lcc的setup）所需的常數。
+
+    Returns:
+        (中央經線, 東偏移, 北偏移, 長半徑, 離心率, 圓錐常數n, 常數c, 原點的rho0)
+    """
+    if not {"8821", "8822", "8823", "8824", "8826", "8827"} <= params.keys():
+        return None
+    lat0, lon0 = params["8821"], params["8822"]
+    lat1, lat2 = params["8823"], params["8824"]
+    false_easting, false_northing = params["8826"], params["8827"]
+    if abs(lat1 + lat2) < _EPS10:
+        return None
+
+    a = ellipsoid.semi_major_metre
+    f = 1.0 / ellipsoid.inverse_flattening if ellipsoid.inverse_flattening else 0.0
+    e = math.sqrt(f * (2.0 - f))
+    m1 = _msfn(lat1, e)
+    ts1 = _tsfn(lat1, e)
+    if abs(lat1 - lat2) >= _EPS10:
+        n = math.log(m1 / _msfn(lat2, e)) / math.log(ts1 / _tsfn(lat2, e))
+    else:
+        n = math.sin(lat1)
+    if n == 0.0:
+        return None
+    c = m1 * ts1 ** -n / n
+    rho0 = 0.0 if abs(abs(lat0) - 0.5 * math.pi) < _EPS10 else c * _tsfn(lat0, e) ** n
+
+    return lon0, false_easting, false_northing, a, e, n, c, rho0
+
+
+def _setup_lcc_forward(params, ellipsoid):
+    setup = _lcc_setup(params, ellipsoid)
+    return None if setup is None else _make_kernel(_load_numba_kernels()._lcc_forward, *setup)
+
+
+def _setup_lcc_inverse(params, ellipsoid):
+    setup = _lcc_setup(params, ellipsoid)
+    return None if setup is None else _make_kernel(_load_numba_kernels()._lcc_inverse, *setup)
+
+
+def _msfn(phi, e):
+    # 緯度phi處的緯線半徑與長半徑之比
+    sin_phi = math.sin(phi)
+    return math.cos(phi) / math.sqrt(1.0 - e * e * sin_phi * sin_phi)
+
+
+def _tsfn(phi, e):
+    # 等角緯度的tan(π/4 - χ/2)
+    sin_phi = math.sin(phi)
+    return math.tan(0.5 * (0.5 * math.pi - phi)) / ((1.0 - e * sin_phi) / (1.0 + e * sin_phi)) ** (0.5 * e)
+
+
+def _conformal_tan(tau, e):
+    # 由緯度的正切值tau求等角緯度的正切值（tau可為numpy陣列）
+    sigma = np.sinh(e * np.arctanh(e * tau / np.sqrt(1.0 + tau * tau)))
+    return tau * np.sqrt(1.0 + sigma * sigma) - sigma * np.sqrt(1.0 + tau * tau)
+
+
+def _latitude_series(e, terms=8, samples=64):
+    """
+    以離散正弦轉換求緯度φ與等角緯度χ互轉的級數係數：χ = φ + Σ c[j] sin(2(j+1)φ)、φ = χ + Σ d[j] sin(2(j+1)χ)。
+    級數係數隨第三扁率n的次方遞減，取8項即小於float64的精度，讓核心不需對每個點以牛頓法反解緯度。
+
+    Returns:
+        (c, d)
+    """
+    theta = -0.5 * math.pi + math.pi * (np.arange(samples) + 0.5) / samples
+    harmonics = np.sin(2.0 * np.outer(np.arange(1, terms + 1), theta))
+
+    # 緯度 -> 等角緯度
+    to_conformal = np.arctan(_conformal_tan(np.tan(theta), e)) - theta
+
+    # 等角緯度 -> 緯度，以牛頓法反解
+    taup = np.tan(theta)
+    e2m = 1.0 - e * e
+    tau = taup / e2m
+    for _ in range(10):
+        taupa = _conformal_tan(tau, e)
+        tau = tau + (taup - taupa) / np.sqrt(1.0 + taupa * taupa) * (1.0 + e2m * tau * tau) / (e2m * np.sqrt(1.0 + tau * tau))
+    to_geodetic = np.arctan(tau) - theta
+
+    return harmonics @ to_conformal * (2.0 / samples), harmonics @ to_geodetic * (2.0 / samples)
+
+
+# 依投影方法名稱對應的核心建立函式（傳入參數與橢球體，參數不足時回傳None）
+_FORWARD_SETUPS = {
+    "Popular Visualisation Pseudo Mercator": _setup_webmerc_forward,
+    "Transverse Mercator": _setup_tmerc_forward,
+    "Lambert Conic Conformal (2SP)": _setup_lcc_forward,
+    }
+_INVERSE_SETUPS = {
+    "Popular Visualisation Pseudo Mercator": _setup_webmerc_inverse,
+    "Transverse Mercator": _setup_tmerc_inverse,
+    "Lambert Conic Conformal (2SP)": _setup_lcc_inverse,
+    }
@@ -0,0 +1,141 @@
+# 測試coordinate_transform的輸出（執行方式：python -m unittest discover tests）
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))+"/lib")
+
+import numpy as np
+import pandas as pd
+
+from coordinate_transform import coordinate_transform
+
+# coordinate_transform模組（套件以同名的函式覆蓋了子模組的屬性）
+_MODULE = sys.modules[coordinate_transform.__module__]
+
+
+class ModeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.in_path = os.path.join(self.directory.name, "t.csv")
+        with open(self.in_path, "w") as file:
+            file.write("x,y,name\n250000,2650000,a\n300000,2700000,b\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_input(self):
+        with open(self.in_path) as file:
+            return file.read()
+
+    def transform(self, **kwargs):
+        return coordinate_transform(self.in_path, "x", "y", 3826, None, "lon", "lat", 4326, **kwargs)
+
+    def test_overwrite_guard(self):
+        # ./t.csv與t.csv為同一個檔案，未設定overwrite時須拋出FileExistsError且不異動輸入表格
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+        original = self.read_input()
+        for in_path, out_path in (("t.csv", "t.csv"), ("./t.csv", "t.csv"), ("t.csv", self.in_path)):
+            with self.subTest(in_path=in_path, out_path=out_path), self.assertRaises(FileExistsError):
+                coordinate_transform(in_path, "x", "y", 3826, out_path, "lon", "lat", 4326)
+        self.assertEqual(self.read_input(), original)
+
+        df = coordinate_transform("./t.csv", "x", "y", 3826, "t.csv", "lon", "lat", 4326, overwrite=True)
+        pd.testing.assert_frame_equal(pd.read_csv(self.in_path), df)
+
+    def test_full(self):
+        out_path = os.path.join(self.directory.name, "out.csv")
+        df = coordinate_transform(self.in_path, "x", "y", 3826, out_path, "lon", "lat", 4326)
+        self.assertEqual(list(df.columns), ["x", "y", "name", "lon", "lat"])
+        pd.testing.assert_frame_equal(pd.read_csv(out_path), df)
+
+    def test_passthrough_columns(self):
+        # 不保留其他欄位時，回傳與寫出的表格只包含輸入與輸出的座標欄位
+        out_path = os.path.join(self.directory.name, "out.csv")
+        df = coordinate_transform(self.in_path, "x", "y", 3826, out_path, "lon", "lat", 4326, passthrough_columns=False)
+        self.assertEqual(list(df.columns), ["x", "y", "lon", "lat"])
+        pd.testing.assert_frame_equal(pd.read_csv(out_path), df)
+        pd.testing.assert_frame_equal(df, self.transform()[["x", "y", "lon", "lat"]])
+
+    def test_sidecar(self):
+        # sidecar只將座標欄位與列索引寫至out_table_path + ".coords.csv"，不寫出out_table_path，合併後與完整表格相同
+        out_path = os.path.join(self.directory.name, "out.csv")
+        df = coordinate_transform(self.in_path, "x", "y", 3826, out_path, "lon", "lat", 4326, mode="sidecar")
+        self.assertFalse(os.path.exists(out_path))
+        coords = pd.read_csv(out_path + ".coords.csv", index_col=0)
+        self.assertEqual(list(coords.columns), ["lon", "lat"])
+        pd.testing.assert_frame_equal(pd.read_csv(self.in_path).join(coords), df)
+
+    def test_inplace(self):
+        # inplace須設定overwrite=True，且不可只保留座標欄位，拒絕時不異動輸入表格
+        original = self.read_input()
+        with self.assertRaises(FileExistsError):
+            self.transform(mode="inplace")
+        with self.assertRaises(ValueError):
+            self.transform(mode="inplace", overwrite=True, passthrough_columns=False)
+        self.assertEqual(self.read_input(), original)
+
+        df = self.transform(mode="inplace", overwrite=True)
+        self.assertEqual(list(df.columns), ["x", "y", "name", "lon", "lat"])
+        pd.testing.assert_frame_equal(pd.read_csv(self.in_path), df)
+
+
+class StreamTransformTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.in_path = self.path("in.csv")
+        rng = np.random.default_rng(0)
+        # 約2.5MB，pyarrow的串流讀取器會分成數個區塊
+        self.df = pd.DataFrame({"x": rng.uniform(2e5, 3e5, 60000), "y": rng.uniform(2.6e6, 2.7e6, 60000)})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def transform(self, out_name, stream, suffix="", **kwargs):
+        # 以_STREAM_THRESHOLD控制是否分塊串流，回傳(回傳的表格, 寫至out_name + suffix的文字)
+        out_path = self.path(out_name)
+        with mock.patch.object(_MODULE, "_STREAM_THRESHOLD", 0 if stream else 2 ** 62), mock.patch.object(_MODULE, "_STREAM_CHUNKSIZE", 10000):
+            df = coordinate_transform(self.in_path, "x", "y", 3826, out_path, "lon", "lat", 4326, **kwargs)
+        with open(out_path + suffix) as file:
+            return df, file.read()
+
+    def assert_stream_parity(self, **kwargs):
+        # 分塊串流與一次讀取整個表格須寫出相同的文字、回傳相同的表格
+        self.df.to_csv(self.in_path, index=False)
+        suffix = ".coords.csv" if kwargs.get("mode") == "sidecar" else ""
+        expected_df, expected_text = self.transform("whole.csv", False, suffix, **kwargs)
+        df, text = self.transform("stream.csv", True, suffix, **kwargs)
+        self.assertEqual(text, expected_text)
+        pd.testing.assert_frame_equal(df, expected_df)
+
+    def test_stream_options(self):
+        self.df["name"] = [f"p{i}" for i in range(len(self.df))]
+        for kwargs in ({}, {"passthrough_columns": False}, {"mode": "sidecar"}, {"precision": 9}, {"dtype": np.float32}):
+            with self.subTest(**kwargs):
+                self.assert_stream_parity(**kwargs)
+
+    def test_stream_dtypes(self):
+        # 只有最後一個區塊的欄位有缺值、文字或前導零時，各區塊仍須以相同的型態寫出
+        last = len(self.df) - 10
+        cases = {
+            "integer gap": pd.array(np.arange(len(self.df)), dtype="Int64"),
+            "boolean gap": [True] * last + [None] * 10,
+            "integer text": [str(i) for i in range(last)] + ["abc"] * 10,
+            "zero padded": ["007"] * last + ["abc"] * 10,
+            }
+        cases["integer gap"][last] = pd.NA
+        for name, column in cases.items():
+            with self.subTest(name):
+                self.df["k"] = column
+                self.assert_stream_parity()
+
+
+if __name__ == "__main__":
+    unittest.main()
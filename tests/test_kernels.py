@@ -0,0 +1,119 @@
+# 比對numba加速核心與pyproj.Transformer的投影結果（執行方式：python -m unittest discover tests）
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))+"/lib")
+
+import numpy as np
+import pandas as pd
+import pyproj
+
+from coordinate_transform import coordinate_transform, kernels
+from coordinate_transform.kernels import find_kernel
+
+# 五分山雷達站為中心的球體等距方位投影（與example1相同的原點）
+_AEQD = "+proj=aeqd +lat_0=25 +lon_0=121 +x_0=0 +y_0=0 +R=6371000 +units=m +type=crs"
+
+# 經緯度正算的額外測試列：NaN、緯度超出±90度、剛好在極點、經度超出±10弧度
+_FORWARD_EDGES = (
+    [np.nan, 10.0, np.nan, 10.0, 10.0, 10.0, 1e6],
+    [10.0, np.nan, np.nan, 95.0, -91.0, 90.0, 10.0],
+    )
+
+# 投影座標反算的額外測試列：NaN
+_INVERSE_EDGES = (
+    [np.nan, 1000.0, np.nan],
+    [1000.0, np.nan, np.nan],
+    )
+
+
+@unittest.skipIf(importlib.util.find_spec("numba") is None, "numba is not installed")
+class KernelParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def assert_parity(self, in_crs, out_crs, x, y, edges, atol):
+        in_crs = pyproj.CRS.from_user_input(in_crs)
+        out_crs = pyproj.CRS.from_user_input(out_crs)
+        kernel = find_kernel(in_crs, out_crs)
+        self.assertIsNotNone(kernel)
+
+        x = np.concatenate([x, edges[0]])
+        y = np.concatenate([y, edges[1]])
+        expected_x, expected_y = pyproj.Transformer.from_crs(in_crs, out_crs, always_xy=True).transform(x, y)
+        actual_x, actual_y = kernel(x, y)
+
+        # NaN與inf的位置須與PROJ相同，其餘座標的差異須在容許誤差內
+        np.testing.assert_allclose(actual_x, expected_x, rtol=0.0, atol=atol)
+        np.testing.assert_allclose(actual_y, expected_y, rtol=0.0, atol=atol)
+
+    def test_aeqd_inverse(self):
+        x = self.rng.uniform(-2e7, 2e7, 10000)
+        y = self.rng.uniform(-2e7, 2e7, 10000)
+        self.assert_parity(_AEQD, "+proj=longlat +R=6371000 +type=crs", x, y, _INVERSE_EDGES, 1e-9)
+
+    def test_webmerc(self):
+        lon = self.rng.uniform(-180, 180, 10000)
+        lat = self.rng.uniform(-85, 85, 10000)
+        self.assert_parity(4326, 3857, lon, lat, _FORWARD_EDGES, 1e-6)
+        x, y = pyproj.Transformer.from_crs(4326, 3857, always_xy=True).transform(lon, lat)
+        self.assert_parity(3857, 4326, x, y, _INVERSE_EDGES, 1e-9)
+
+    def test_tmerc(self):
+        lon = self.rng.uniform(117, 129, 10000)
+        lat = self.rng.uniform(-80, 84, 10000)
+        for zone in (32651, 32751):
+            self.assert_parity(4326, zone, lon, lat, _FORWARD_EDGES, 1e-6)
+            x, y = pyproj.Transformer.from_crs(4326, zone, always_xy=True).transform(lon, lat)
+            self.assert_parity(zone, 4326, x, y, ([*_INVERSE_EDGES[0], 1e8], [*_INVERSE_EDGES[1], 3e6]), 1e-9)
+
+    def test_tmerc_domain(self):
+        # 全球範圍的點，包含距中央經線約90度的定義域邊界，是否有限須與PROJ相同
+        lon = self.rng.uniform(-180, 180, 200000)
+        lat = self.rng.uniform(-90, 90, 200000)
+        self.assert_parity(4326, 32651, lon, lat, _FORWARD_EDGES, 1e-3)
+
+    def test_lcc(self):
+        lon = self.rng.uniform(-5, 10, 10000)
+        lat = self.rng.uniform(41, 52, 10000)
+        self.assert_parity(4171, 2154, lon, lat, ([*_FORWARD_EDGES[0], 3.0], [*_FORWARD_EDGES[1], -90.0]), 1e-6)
+        x, y = pyproj.Transformer.from_crs(4171, 2154, always_xy=True).transform(lon, lat)
+        self.assert_parity(2154, 4171, x, y, _INVERSE_EDGES, 1e-9)
+
+
+# CUDA核心以numba的CUDA模擬器測試（執行方式：NUMBA_ENABLE_CUDASIM=1 python -m unittest discover tests）
+@unittest.skipIf(importlib.util.find_spec("numba") is None, "numba is not installed")
+@unittest.skipUnless(os.environ.get("NUMBA_ENABLE_CUDASIM") == "1", "NUMBA_ENABLE_CUDASIM is not set")
+class CudaKernelTest(unittest.TestCase):
+
+    def test_stream_reaches_gpu(self):
+        # 分塊串流時區塊須放大至超過_CUDA_THRESHOLD列，使每個區塊都改以GPU投影，結果與PROJ相同
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"lon": rng.uniform(-180, 180, 2000), "lat": rng.uniform(-85, 85, 2000)})
+        module = sys.modules[coordinate_transform.__module__]
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(kernels, "_CUDA_THRESHOLD", 500), \
+                mock.patch.object(module, "_STREAM_THRESHOLD", 0), \
+                mock.patch.object(module, "_STREAM_CHUNKSIZE", 100), \
+                mock.patch.object(module, "read_csv_chunks", wraps=module.read_csv_chunks) as read_csv_chunks, \
+                mock.patch.object(kernels, "_launch_cuda", wraps=kernels._launch_cuda) as launch_cuda:
+            in_path = os.path.join(directory, "in.csv")
+            out_path = os.path.join(directory, "out.csv")
+            df.to_csv(in_path, index=False)
+            result = coordinate_transform(in_path, "lon", "lat", 4326, out_path, "x", "y", 3857, use_kernels=True)
+
+        self.assertEqual(read_csv_chunks.call_args.args[1], 501)
+        sizes = [call.args[1].shape[0] for call in launch_cuda.call_args_list]
+        self.assertTrue(all(size > 500 for size in sizes))
+        self.assertEqual(sum(sizes), len(df))
+        expected_x, expected_y = pyproj.Transformer.from_crs(4326, 3857, always_xy=True).transform(df["lon"], df["lat"])
+        np.testing.assert_allclose(result["x"], expected_x, rtol=0.0, atol=1e-6)
+        np.testing.assert_allclose(result["y"], expected_y, rtol=0.0, atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+# 測試GIS.management的XYTableToPoint（執行方式：python -m unittest discover tests）
+import os
+import sys
+import tempfile
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))+"/lib")
+
+import pandas as pd
+
+from GIS.management import XYTableToPoint
+
+
+class XYTableToPointTest(unittest.TestCase):
+
+    def test_header_only_table(self):
+        # 只有標題列的表格仍須回傳空的點圖層
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "table.csv")
+            with open(path, "w") as file:
+                file.write("x,y,z,name\n")
+            gdf = XYTableToPoint(path, None, "x", "y", coordinate_system=4326)
+            self.assertEqual(len(gdf), 0)
+            self.assertEqual(gdf.crs.to_epsg(), 4326)
+            self.assertEqual(len(XYTableToPoint(path, None, "x", "y", z_field="z")), 0)
+
+            # pandas.read_csv將只有標題列的表格讀成object欄位
+            gdf = XYTableToPoint(pd.read_csv(path), None, "x", "y", z_field="z")
+            self.assertEqual(len(gdf), 0)
+
+    def test_points(self):
+        df = pd.DataFrame({"x": [121, 122], "y": [25, 24.5], "z": [1, 2]})
+        gdf = XYTableToPoint(df, None, "x", "y", z_field="z")
+        self.assertEqual([(point.x, point.y, point.z) for point in gdf.geometry], [(121.0, 25.0, 1.0), (122.0, 24.5, 2.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# 比對GIS.lib.TableIO的pyarrow讀取器、寫入器與pandas.read_csv、DataFrame.to_csv的結果（執行方式：python -m unittest discover tests）
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))+"/lib")
+
+import numpy as np
+import pandas as pd
+
+from GIS.lib.TableIO import CsvStreamError, read_csv, read_csv_chunks, write_csv
+
+# pyarrow與pandas解析結果曾經不同的儲存格：十六進位、正號、pandas的缺值字串、日期時間、布林值、超出int64範圍的整數、17位有效數字的浮點數
+_CELLS = [
+    "0x10", "+5", "None", "<NA>", "NA", "", "2020-01-01", "12:30", "True", "1", "0",
+    "99999999999999999999", "9223372036854775808", "1e+20", "0.30000000000000004", "123.45678901234567", "abc",
+    ]
+
+
+@unittest.skipIf(importlib.util.find_spec("pyarrow") is None, "pyarrow is not installed")
+class ReadCsvParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "table.csv")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, text):
+        with open(self.path, "w", newline="") as file:
+            file.write(text)
+
+    def expected(self, **kwargs):
+        # pyarrow以正確捨入解析浮點數，因此與pandas的round_trip解析比對
+        return pd.read_csv(self.path, float_precision="round_trip", **kwargs)
+
+    def read_chunks(self, chunksize, **kwargs):
+        # 與coordinate_transform的串流相同，pyarrow無法處理時改以pandas重新讀取
+        try:
+            return list(read_csv_chunks(self.path, chunksize, **kwargs))
+        except CsvStreamError:
+            return list(read_csv_chunks(self.path, chunksize, use_pyarrow=False, **kwargs))
+
+    def assert_parity(self, **kwargs):
+        expected = self.expected(**kwargs)
+        pd.testing.assert_frame_equal(read_csv(self.path, **kwargs), expected)
+        pd.testing.assert_frame_equal(pd.concat(self.read_chunks(10, **kwargs)), expected)
+
+    def test_cells(self):
+        for cell in _CELLS:
+            for other in ("7", "7.5", "abc", "True", "", "2020-01-02", cell):
+                with self.subTest(cell=cell, other=other):
+                    self.write(f"x,y,v\n1,2,{cell}\n3,4,{other}\n")
+                    self.assert_parity()
+
+    def test_usecols(self):
+        self.write("x,y,v,w\n1,2,0x10,a\n3,4,5,b\n")
+        self.assert_parity(usecols=["x", "y"])
+
+    def test_ragged_rows(self):
+        self.write("x,y\n1,2,\n3,4\n")
+        pd.testing.assert_frame_equal(read_csv(self.path), pd.read_csv(self.path))
+
+    def test_duplicate_header(self):
+        self.write("x,y,v,v\n1,2,3,4\n")
+        self.assertEqual(list(read_csv(self.path).columns), ["x", "y", "v", "v.1"])
+        self.assert_parity()
+
+    def test_random_floats(self):
+        rng = np.random.default_rng(0)
+        pd.DataFrame({
+            "x": rng.uniform(1e5, 3e5, 1000),
+            "y": rng.normal(size=1000) * 10.0 ** rng.integers(-20, 20, 1000),
+            "k": np.arange(1000),
+            }).to_csv(self.path, index=False)
+        self.assert_parity()
+
+    def test_chunks(self):
+        pd.DataFrame({"x": np.arange(2500) * 0.5, "y": np.arange(2500), "name": [f"p{i}" for i in range(2500)]}).to_csv(self.path, index=False)
+        chunks = self.read_chunks(1000)
+        self.assertTrue(all(len(chunk) >= 1000 for chunk in chunks[:-1]))
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), self.expected())
+
+
+class WriteCsvParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "table.csv")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_parity(self, df):
+        # 以write_csv一次寫出、或分塊附加寫出的文字，皆須與DataFrame.to_csv相同
+        expected = df.to_csv(index=False, lineterminator="\n")
+        write_csv(df, self.path)
+        with open(self.path) as file:
+            self.assertEqual(file.read(), expected)
+
+        middle = len(df) // 2
+        write_csv(df.iloc[:middle], self.path)
+        write_csv(df.iloc[middle:], self.path, append=True)
+        with open(self.path) as file:
+            self.assertEqual(file.read(), expected)
+
+    def test_floats(self):
+        rng = np.random.default_rng(0)
+        special = [np.nan, np.inf, -np.inf, 100.0, -0.0, 8.983152841195214e-06, 1e16, 1e-300]
+        values = np.concatenate([special, rng.normal(size=1000) * 10.0 ** rng.integers(-20, 20, 1000)])
+        self.assert_parity(pd.DataFrame({
+            "x": values,
+            "y": values[::-1].astype(np.float32),
+            }))
+
+    def test_integers(self):
+        self.assert_parity(pd.DataFrame({
+            "x": np.array([0, 1, 2 ** 64 - 1, 2 ** 63], dtype=np.uint64),
+            "y": np.array([-2 ** 63, -1, 0, 2 ** 63 - 1], dtype=np.int64),
+            "z": [0.5, np.nan, 1.0, 2.0],
+            }))
+
+    def test_single_column_and_text(self):
+        self.assert_parity(pd.DataFrame({"x": [np.nan, 1.0, 2.5, np.nan]}))
+        self.assert_parity(pd.DataFrame({"x": [1.0, 2.0], "name": ["a,b", 'say "hi"']}))
+
+    def test_chunked_round_trip(self):
+        # 分塊讀取再以append附加寫出，結果須與整個表格以to_csv寫出相同
+        rng = np.random.default_rng(1)
+        source = os.path.join(self.directory.name, "source.csv")
+        df = pd.DataFrame({"x": rng.uniform(1e5, 3e5, 2500), "y": rng.uniform(2e6, 3e6, 2500), "k": np.arange(2500)})
+        df.to_csv(source, index=False)
+        for use_pyarrow in (True, False):
+            with self.subTest(use_pyarrow=use_pyarrow):
+                for i, chunk in enumerate(read_csv_chunks(source, 1000, use_pyarrow=use_pyarrow)):
+                    write_csv(chunk, self.path, append=i > 0)
+                with open(self.path) as file:
+                    self.assertEqual(file.read(), df.to_csv(index=False, lineterminator="\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()